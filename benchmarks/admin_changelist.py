@@ -0,0 +1,133 @@
+"""
+Запросы и время списка постов в админке: исходный PostAdmin и быстрый.
+
+Исходный — list_editable с <select> всех групп, COUNT(*) всей таблицы
+и поиск LIKE; быстрый — posts.admin.PostAdmin (оценка числа строк,
+list_select_related, автодополнение, поиск через FTS5).
+
+Запуск из корня репозитория (на 1M постов заполнение занимает
+около минуты):
+
+    python benchmarks/admin_changelist.py [--posts 1000000] [--groups 500]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib import admin  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from posts.admin import PostAdmin  # noqa: E402
+from posts.models import Group, Post, User  # noqa: E402
+from posts.search import get_search_backend  # noqa: E402
+
+BATCH_SIZE = 10000
+WORDS = ('кошки', 'собаки', 'погода', 'дождь', 'солнце', 'город', 'море')
+
+
+class LegacyPostAdmin(admin.ModelAdmin):
+    """PostAdmin до оптимизации."""
+
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    empty_value_display = '-пусто-'
+    list_editable = ('group',)
+
+
+def fill(posts, groups):
+    author = User.objects.create_superuser(
+        username='admin', email='admin@example.com', password='benchmark'
+    )
+    group_ids = [
+        Group.objects.create(title=f'Группа {number}', slug=f'g{number}').pk
+        for number in range(groups)
+    ]
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, posts, BATCH_SIZE):
+            cursor.executemany(
+                'INSERT INTO posts_post (text, pub_date, updated_at, version, '
+                'author_id, group_id, image, comments_count) '
+                "VALUES (%s, %s, %s, 1, %s, %s, '', 0)",
+                [
+                    (
+                        f'{WORDS[number % len(WORDS)]} '
+                        f'{WORDS[number * 7 % len(WORDS)]} пост {number}',
+                        now - timezone.timedelta(seconds=number),
+                        now - timezone.timedelta(seconds=number),
+                        author.pk,
+                        group_ids[number % groups],
+                    )
+                    for number in range(start, min(start + BATCH_SIZE, posts))
+                ],
+            )
+    get_search_backend().rebuild()
+    return author
+
+
+def measure(model_admin, request):
+    with CaptureQueriesContext(connection) as context:
+        started = time.perf_counter()
+        response = model_admin.changelist_view(request).render()
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.status_code
+    return len(context.captured_queries), elapsed, len(response.content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=1000000)
+    parser.add_argument('--groups', type=int, default=500)
+    args = parser.parse_args()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        author = fill(args.posts, args.groups)
+        print(
+            f'Постов: {args.posts}, групп: {args.groups}, '
+            f'заполнение {time.perf_counter() - started:.1f} с'
+        )
+        url = reverse('admin:posts_post_changelist')
+        last_page = (args.posts - 1) // PostAdmin.list_per_page
+        cases = (
+            ('первая страница', {}),
+            ('последняя', {'p': last_page}),
+            ('поиск', {'q': 'кошки'}),
+        )
+        print(
+            f'{"admin":<10}{"страница":<17}{"запросов":>10}'
+            f'{"время, мс":>12}{"HTML, КБ":>10}'
+        )
+        for name, admin_class in (
+            ('исходный', LegacyPostAdmin), ('быстрый', PostAdmin),
+        ):
+            model_admin = admin_class(Post, admin.site)
+            for case, params in cases:
+                request = RequestFactory().get(url, params)
+                request.user = author
+                queries, elapsed, size = measure(model_admin, request)
+                print(
+                    f'{name:<10}{case:<17}{queries:>10}'
+                    f'{elapsed * 1000:>12.0f}{size / 1024:>10.0f}'
+                )
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Чтения и записи в секунду при одновременной нагрузке для профилей
+базы данных: SQLite без настроек (журнал DELETE, соединение на каждый
+запрос) и SQLite с SQLITE_PRAGMAS (WAL) и постоянными соединениями.
+С DB_ENGINE=postgresql сравниваются соединения на каждый запрос
+и постоянные (CONN_MAX_AGE).
+
+Читатели открывают страницу поста, писатели оставляют комментарии;
+после каждого запроса соединения закрываются по CONN_MAX_AGE,
+как в обработчике запросов сервера.
+
+Запуск из корня репозитория:
+
+    python benchmarks/db_profiles.py [--readers 8] [--writers 4] [--seconds 5]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import (DatabaseError, close_old_connections,  # noqa: E402
+                       connections)
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from posts.models import Post, User  # noqa: E402
+
+COMMENTS = 50
+
+
+def profiles():
+    """Профили: (название, CONN_MAX_AGE, SQLITE_PRAGMAS, OPTIONS)."""
+    if settings.DB_ENGINE == 'postgresql':
+        options = settings.DATABASES['default']['OPTIONS']
+        return [
+            ('pg, соединение на запрос', 0, {}, options),
+            ('pg, постоянные', settings.DB_CONN_MAX_AGE, {}, options),
+        ]
+    return [
+        ('sqlite по умолчанию', 0, {}, {}),
+        (
+            'sqlite WAL',
+            settings.DB_CONN_MAX_AGE,
+            settings.SQLITE_PRAGMAS,
+            settings.DATABASES['default']['OPTIONS'],
+        ),
+    ]
+
+
+def run_client(client, method, url, data, deadline):
+    """Запросы до deadline; возвращает (успешных, ошибок)."""
+    done = failed = 0
+    while time.perf_counter() < deadline:
+        try:
+            getattr(client, method)(url, data)
+            done += 1
+        except DatabaseError:
+            failed += 1
+        close_old_connections()
+    connections.close_all()
+    return done, failed
+
+
+def measure(readers, writers, seconds):
+    author = User.objects.create_user(username='author')
+    post = Post.objects.create(text='Прямой эфир', author=author)
+    for number in range(COMMENTS):
+        post.comments.create(author=author, text=f'comment {number}')
+    detail_url = reverse('posts:post_detail', args=[post.id])
+    comment_url = reverse('posts:add_comment', args=[post.id])
+    tasks = [(Client(), 'get', detail_url, {}) for _ in range(readers)]
+    for number in range(writers):
+        client = Client()
+        client.force_login(
+            User.objects.create_user(username=f'writer_{number}')
+        )
+        tasks.append((client, 'post', comment_url, {'text': 'comment'}))
+    connections.close_all()
+    deadline = time.perf_counter() + seconds
+    with ThreadPoolExecutor(len(tasks)) as executor:
+        results = list(executor.map(
+            lambda task: run_client(*task, deadline), tasks
+        ))
+    reads = sum(done for done, _ in results[:readers])
+    writes = sum(done for done, _ in results[readers:])
+    errors = sum(failed for _, failed in results)
+    return reads / seconds, writes / seconds, errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    database = connections.databases['default']
+    print(f'{"профиль":28}{"чтений/с":>10}{"записей/с":>11}{"ошибок":>8}')
+    for title, conn_max_age, pragmas, options in profiles():
+        database.update(CONN_MAX_AGE=conn_max_age, OPTIONS=options)
+        if database['ENGINE'].endswith('sqlite3'):
+            database['TEST']['NAME'] = os.path.join(
+                tempfile.mkdtemp(), 'db_profiles.sqlite3'
+            )
+        with override_settings(SQLITE_PRAGMAS=pragmas, WRITE_BUFFER=False):
+            connection = connections['default']
+            old_name = connection.creation.create_test_db(verbosity=0)
+            try:
+                reads, writes, errors = measure(
+                    args.readers, args.writers, args.seconds
+                )
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        print(f'{title:28}{reads:>10.0f}{writes:>11.0f}{errors:>8}')
+
+
+if __name__ == '__main__':
+    main()
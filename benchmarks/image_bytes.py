@@ -0,0 +1,137 @@
+"""
+Байты картинок на одну страницу ленты: до и после вариантов srcset.
+
+До — каждая карточка грузит один JPEG 960x339 независимо от экрана.
+После — браузер выбирает из srcset наименьший вариант не уже
+нужной ширины (ширина экрана в CSS-пикселях × DPR) в самом компактном
+из доступных форматов.
+
+Запуск из корня репозитория:
+
+    python benchmarks/image_bytes.py [--posts 10] [--size 2400x1600]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from PIL import Image  # noqa: E402
+from posts.models import Post, User  # noqa: E402
+from posts.thumbnails import (backend, generate_thumbnail,  # noqa: E402
+                              image_formats, image_variants)
+from sorl.thumbnail import default  # noqa: E402
+
+# (название, ширина экрана в CSS-пикселях, device pixel ratio)
+VIEWPORTS = (
+    ('телефон', 360, 2),
+    ('телефон, DPR 1', 360, 1),
+    ('планшет', 768, 1),
+    ('десктоп', 1920, 1),
+)
+
+
+def make_image(width, height):
+    """Фотоподобная картинка: градиент с шумом плохо сжимается, как фото."""
+    image = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    noise = Image.effect_noise((width, height), 32).convert('RGB')
+    image = Image.blend(image, noise, 0.15)
+    buffer = BytesIO()
+    image.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def variant_sizes(name):
+    """{формат: {ширина: байты}} для готовых вариантов картинки."""
+    sizes = {}
+    for image_format, width, geometry in image_variants():
+        thumbnail = backend.cached_thumbnail(
+            name, geometry, format=image_format,
+            **settings.POST_THUMBNAIL_OPTIONS,
+        )
+        sizes.setdefault(image_format, {})[width] = (
+            default.storage.size(thumbnail.name)
+        )
+    return sizes
+
+
+def legacy_size(name):
+    thumbnail = backend.get_thumbnail(
+        name, settings.POST_THUMBNAIL_GEOMETRY, format='JPEG',
+        **settings.POST_THUMBNAIL_OPTIONS,
+    )
+    return default.storage.size(thumbnail.name)
+
+
+def chosen_size(sizes, css_width, dpr):
+    """Повторяет выбор браузера по srcset и sizes из post_image.html."""
+    best_format = image_formats()[0]
+    widths = sorted(sizes[best_format])
+    needed = min(css_width, widths[-1]) * dpr
+    width = next((width for width in widths if width >= needed), widths[-1])
+    return sizes[best_format][width]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--posts', type=int, default=settings.NUMBER_OF_POSTS)
+    parser.add_argument('--size', default='2400x1600')
+    args = parser.parse_args()
+    width, height = map(int, args.size.split('x'))
+
+    media_root = tempfile.mkdtemp()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(
+            MEDIA_ROOT=media_root, POST_THUMBNAIL_WORKERS=0
+        ):
+            author = User.objects.create_user(username='benchmark')
+            before = 0
+            after = {name: 0 for name, *_ in VIEWPORTS}
+            for number in range(args.posts):
+                random.seed(number)
+                post = Post.objects.create(
+                    author=author,
+                    text=f'Пост {number}',
+                    image=SimpleUploadedFile(
+                        f'benchmark_{number}.jpg', make_image(width, height),
+                        content_type='image/jpeg',
+                    ),
+                )
+                generate_thumbnail(post.id, post.image.name)
+                before += legacy_size(post.image.name)
+                sizes = variant_sizes(post.image.name)
+                for name, css_width, dpr in VIEWPORTS:
+                    after[name] += chosen_size(sizes, css_width, dpr)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    print(f'Форматы вариантов: {", ".join(image_formats())}')
+    print(f'Постов на странице: {args.posts}, исходники {args.size}')
+    print(f'{"экран":<16}{"до, КБ":>10}{"после, КБ":>12}{"экономия":>10}')
+    for name, css_width, dpr in VIEWPORTS:
+        saved = 1 - after[name] / before
+        print(
+            f'{name:<16}{before / 1024:>10.1f}{after[name] / 1024:>12.1f}'
+            f'{saved:>10.0%}'
+        )
+
+
+if __name__ == '__main__':
+    main()
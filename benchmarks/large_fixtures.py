@@ -0,0 +1,218 @@
+"""
+Генератор больших воспроизводимых данных для бенчмарков posts.
+
+При scale=1: 10 000 пользователей, 100 групп, 1 000 000 постов,
+5 000 000 комментариев и граф подписок со степенным распределением
+(немногие авторы собирают большую часть подписчиков, постов
+и комментариев). Одинаковые scale и seed дают одинаковые данные
+с точностью до времени запуска.
+
+Посты и комментарии вставляются пачками в обход ORM; счётчики,
+comments_count и ленты подписок заполняются так же, как их
+поддерживают сигналы.
+"""
+import random
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+from posts.counters import recount_users
+from posts.models import Follow, Group, User
+
+USERS = 10000
+GROUPS = 100
+POSTS = 1000000
+COMMENTS = 5000000
+# Число подписок пользователя — Парето с минимумом FOLLOWS_MIN,
+# авторы выбираются по закону Ципфа с показателем ZIPF_EXPONENT.
+FOLLOWS_MIN = 3
+FOLLOWS_MAX = 500
+ZIPF_EXPONENT = 1.1
+GROUP_SHARE = 0.7
+BATCH_SIZE = 10000
+WORDS = (
+    'кошки', 'собаки', 'погода', 'дождь', 'солнце', 'город', 'море',
+    'книга', 'музыка', 'поезд', 'утро', 'вечер', 'кофе', 'лес',
+)
+
+
+def scaled(value, scale):
+    return max(int(value * scale), 1)
+
+
+def zipf_sampler(rng, population, exponent=ZIPF_EXPONENT):
+    """Выборка из population, где k-й элемент в k^exponent реже первого."""
+    cum_weights = list(accumulate(
+        1 / rank ** exponent for rank in range(1, len(population) + 1)
+    ))
+
+    def sample(count):
+        return rng.choices(population, cum_weights=cum_weights, k=count)
+    return sample
+
+
+def insert_rows(sql, rows):
+    with connection.cursor() as cursor:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def create_users(count):
+    password = make_password(None)
+    User.objects.bulk_create(
+        (
+            User(username=f'user{number}', password=password)
+            for number in range(count)
+        ),
+    )
+    return list(User.objects.order_by('id').values_list('id', flat=True))
+
+
+def create_groups(count):
+    Group.objects.bulk_create(
+        Group(
+            title=f'Группа {number}',
+            slug=f'group-{number}',
+            description=f'Описание группы {number}',
+        )
+        for number in range(count)
+    )
+    return list(Group.objects.order_by('id').values_list('id', flat=True))
+
+
+def create_follows(rng, user_ids):
+    """Подписки: у популярных авторов на порядки больше подписчиков."""
+    authors = zipf_sampler(rng, rng.sample(user_ids, len(user_ids)))
+    follows = []
+    for user_id in user_ids:
+        wanted = min(int(FOLLOWS_MIN * rng.paretovariate(1.5)), FOLLOWS_MAX)
+        following = set(authors(wanted * 2)) - {user_id}
+        follows.extend(
+            Follow(user_id=user_id, author_id=author_id)
+            for author_id in list(following)[:wanted]
+        )
+    Follow.objects.bulk_create(follows)
+
+
+def create_posts(rng, count, user_ids, group_ids, comments_counts, now):
+    """
+    Посты от новых к старым с шагом в минуту; id идут подряд
+    в том же порядке. Возвращает id самого нового.
+    """
+    authors = zipf_sampler(rng, rng.sample(user_ids, len(user_ids)))(count)
+    groups = zipf_sampler(rng, group_ids)(count)
+    adapt = connection.ops.adapt_datetimefield_value
+
+    def rows():
+        for number in range(count):
+            pub_date = adapt(now - timedelta(minutes=number))
+            yield (
+                ' '.join(rng.choices(WORDS, k=12)) + f' пост {number}',
+                pub_date,
+                pub_date,
+                authors[number],
+                groups[number] if rng.random() < GROUP_SHARE else None,
+                comments_counts[number],
+            )
+    insert_rows(
+        'INSERT INTO posts_post (text, pub_date, updated_at, version, '
+        'author_id, group_id, image, comments_count) '
+        "VALUES (%s, %s, %s, 1, %s, %s, '', %s)",
+        rows(),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT MIN(id) FROM posts_post')
+        return cursor.fetchone()[0]
+
+
+def create_comments(rng, post_numbers, first_post_id, user_ids, now):
+    """Комментарии в течение часа после публикации поста."""
+    commenters = zipf_sampler(rng, rng.sample(user_ids, len(user_ids)))
+    adapt = connection.ops.adapt_datetimefield_value
+
+    def rows():
+        for number, author_id in zip(
+            post_numbers, commenters(len(post_numbers))
+        ):
+            pub_date = adapt(now - timedelta(
+                minutes=number, seconds=-rng.randrange(3600)
+            ))
+            yield (
+                ' '.join(rng.choices(WORDS, k=6)),
+                pub_date,
+                pub_date,
+                first_post_id + number,
+                author_id,
+            )
+    insert_rows(
+        'INSERT INTO posts_comment (text, pub_date, updated_at, version, '
+        'post_id, author_id) VALUES (%s, %s, %s, 1, %s, %s)',
+        rows(),
+    )
+
+
+def fill_timelines():
+    """
+    Ленты подписок: последние TIMELINE_BACKFILL_SIZE постов каждого
+    автора, на которого подписан пользователь, кроме «знаменитостей»,
+    чьи посты подмешиваются при чтении.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO posts_timelineentry (user_id, post_id, pub_date) '
+            'SELECT f.user_id, p.id, p.pub_date FROM posts_follow f '
+            'JOIN (SELECT id, author_id, pub_date, ROW_NUMBER() OVER ('
+            '  PARTITION BY author_id ORDER BY pub_date DESC'
+            ') AS position FROM posts_post) p '
+            'ON p.author_id = f.author_id AND p.position <= %s '
+            'WHERE f.author_id NOT IN ('
+            '  SELECT user_id FROM posts_usercounters '
+            '  WHERE followers_count > %s'
+            ')',
+            [settings.TIMELINE_BACKFILL_SIZE, settings.TIMELINE_FANOUT_LIMIT],
+        )
+
+
+def fill(scale=1, seed=0, log=print):
+    """Заполняет пустую базу; возвращает число созданных строк по типам."""
+    rng = random.Random(seed)
+    # Самый свежий пост — час назад, чтобы комментарии к нему
+    # не оказались в будущем.
+    now = timezone.now() - timedelta(hours=1)
+    sizes = {
+        'users': scaled(USERS, scale),
+        'groups': scaled(GROUPS, scale),
+        'posts': scaled(POSTS, scale),
+        'comments': scaled(COMMENTS, scale),
+    }
+    with transaction.atomic():
+        user_ids = create_users(sizes['users'])
+        group_ids = create_groups(sizes['groups'])
+        create_follows(rng, user_ids)
+        log('Пользователи, группы и подписки созданы')
+        # Больше всего комментариев у свежих постов.
+        post_numbers = zipf_sampler(rng, range(sizes['posts']), 0.8)(
+            sizes['comments']
+        )
+        comments_counts = Counter(post_numbers)
+        first_post_id = create_posts(
+            rng, sizes['posts'], user_ids, group_ids, comments_counts, now
+        )
+        log('Посты созданы')
+        create_comments(rng, post_numbers, first_post_id, user_ids, now)
+        log('Комментарии созданы')
+        recount_users()
+        fill_timelines()
+        log('Счётчики и ленты заполнены')
+    sizes['follows'] = Follow.objects.count()
+    return sizes
@@ -0,0 +1,94 @@
+"""
+Накладные расходы MetricsMiddleware: время запроса к ленте, странице
+поста и профилю с замерами и без них (профиль prod).
+
+Оба клиента работают в одном процессе и чередуются блоками по
+--block запросов, чтобы шум машины влиял на них одинаково; в таблицу
+идёт медиана по блокам. Клиент без замеров собран с
+METRICS_ENABLED=False: middleware для него не подключается, а обёртки
+кеша и шаблонов ничего не записывают. Запуск из корня репозитория:
+
+    python benchmarks/metrics_overhead.py [--blocks 40] [--block 100]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('DJANGO_ENV', 'prod')
+os.environ.setdefault('DJANGO_ALLOWED_HOSTS', 'testserver')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from posts.models import Post, User  # noqa: E402
+
+POSTS = 30
+
+
+def make_client(enabled, urls):
+    """Клиент, чья цепочка middleware собрана с METRICS_ENABLED=enabled."""
+    client = Client()
+    with override_settings(METRICS_ENABLED=enabled):
+        for url in urls:
+            client.get(url)
+    return client
+
+
+def run_block(client, urls, requests):
+    started = time.perf_counter()
+    for number in range(requests):
+        client.get(urls[number % len(urls)])
+    return (time.perf_counter() - started) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--blocks', type=int, default=40)
+    parser.add_argument('--block', type=int, default=100)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        author = User.objects.create_user(username='author')
+        posts = [
+            Post.objects.create(text=f'Пост {number}', author=author)
+            for number in range(POSTS)
+        ]
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=[posts[0].id]),
+            reverse('posts:profile', args=[author.username]),
+        ]
+        clients = {
+            'выкл': make_client(False, urls),
+            'вкл': make_client(True, urls),
+        }
+        times = {title: [] for title in clients}
+        for _ in range(args.blocks):
+            for title, client in clients.items():
+                times[title].append(run_block(client, urls, args.block))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    medians = {title: statistics.median(times[title]) for title in times}
+    print(f'{"метрики":10}{"запрос, мс":>12}')
+    for title, median in medians.items():
+        print(f'{title:10}{median:>12.3f}')
+    overhead = medians['вкл'] / medians['выкл'] - 1
+    print(f'накладные расходы: {overhead * 100:.2f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Набор бенчмарков приложения posts на больших данных (large_fixtures):
+p50/p99 времени ответа и число запросов к БД для главной страницы,
+глубокой страницы ленты, группы, профиля, страницы поста, ленты
+подписок и пишущих представлений, со сравнением с сохранённым
+baseline (posts_suite_baseline.json).
+
+База заполняется один раз и переиспользуется следующими запусками
+с теми же --scale и --seed (--fresh заполняет заново). Сценарии идут
+по кругу, кеш очищается перед каждым запросом: измеряется работа БД
+и шаблонов, а не попадания в кеш.
+
+Запуск из корня репозитория (при --scale 1 — 1M постов и 5M
+комментариев — заполнение занимает несколько минут):
+
+    python benchmarks/posts_suite.py [--scale 1] [--requests 50]
+    python benchmarks/posts_suite.py --scale 0.05 --save-baseline
+
+Код возврата 1, если p50 сценария хуже baseline больше чем на
+--tolerance или у сценария выросло число запросов.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS_DIR.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+import large_fixtures  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.models import Count  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from posts.models import Group, Post, UserCounters  # noqa: E402
+
+BASELINE_PATH = BENCHMARKS_DIR / 'posts_suite_baseline.json'
+DATA_DIR = BENCHMARKS_DIR / 'data'
+
+
+def prepare_database(scale, seed, fresh):
+    """Создаёт или переиспользует заполненную базу; возвращает её размеры."""
+    name = f'posts_suite_{scale}_{seed}'
+    sizes_path = DATA_DIR / f'{name}.json'
+    DATA_DIR.mkdir(exist_ok=True)
+    database = connection.settings_dict
+    if database['ENGINE'].endswith('sqlite3'):
+        database['TEST']['NAME'] = str(DATA_DIR / f'{name}.sqlite3')
+    keepdb = not fresh and sizes_path.exists()
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, keepdb=keepdb
+    )
+    if not keepdb:
+        started = time.perf_counter()
+        sizes = large_fixtures.fill(scale, seed)
+        sizes['fill_seconds'] = round(time.perf_counter() - started, 1)
+        sizes_path.write_text(json.dumps(sizes))
+    return old_name, json.loads(sizes_path.read_text())
+
+
+def find_targets():
+    """Самые нагруженные объекты: на них и идут запросы сценариев."""
+    counters = UserCounters.objects.select_related('user')
+    reader = counters.order_by('-following_count').first().user
+    followable = counters.filter(
+        followers_count__lt=settings.TIMELINE_FANOUT_LIMIT,
+        posts_count__gt=0,
+    ).exclude(user=reader).exclude(
+        user__following__user=reader
+    ).order_by('-posts_count').first().user
+    return {
+        'reader': reader,
+        'top_author': counters.order_by('-posts_count').first().user,
+        'followable': followable,
+        'group': Group.objects.annotate(
+            posts_number=Count('groups')
+        ).order_by('-posts_number').first(),
+        'hot_post': Post.objects.order_by('-comments_count').first(),
+        'deep_page': Post.objects.count() // settings.NUMBER_OF_POSTS // 2,
+    }
+
+
+def make_scenarios(targets):
+    """(название, функция(client, номер запроса) -> ответ)."""
+    follow_args = [targets['followable'].username]
+    return [
+        ('index', lambda client, number: client.get(
+            reverse('posts:index')
+        )),
+        ('index_deep_page', lambda client, number: client.get(
+            reverse('posts:index'), {'page': targets['deep_page']}
+        )),
+        ('group_posts', lambda client, number: client.get(
+            reverse('posts:group_list', args=[targets['group'].slug])
+        )),
+        ('profile', lambda client, number: client.get(
+            reverse('posts:profile', args=[targets['top_author'].username])
+        )),
+        ('post_detail', lambda client, number: client.get(
+            reverse('posts:post_detail', args=[targets['hot_post'].id])
+        )),
+        ('follow_index', lambda client, number: client.get(
+            reverse('posts:follow_index')
+        )),
+        ('post_create', lambda client, number: client.post(
+            reverse('posts:post_create'), {'text': f'Новый пост {number}'}
+        )),
+        ('add_comment', lambda client, number: client.post(
+            reverse('posts:add_comment', args=[targets['hot_post'].id]),
+            {'text': f'Новый комментарий {number}'},
+        )),
+        # Подписка и отписка чередуются, поэтому каждая что-то меняет.
+        ('profile_follow', lambda client, number: client.get(
+            reverse('posts:profile_follow', args=follow_args)
+        )),
+        ('profile_unfollow', lambda client, number: client.get(
+            reverse('posts:profile_unfollow', args=follow_args)
+        )),
+    ]
+
+
+def run(scenarios, client, requests):
+    samples = {name: ([], []) for name, _ in scenarios}
+    for number in range(requests):
+        for name, request in scenarios:
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = request(client, number)
+                elapsed = time.perf_counter() - started
+            assert response.status_code in (200, 302), (
+                name, response.status_code
+            )
+            times, queries = samples[name]
+            times.append(elapsed * 1000)
+            queries.append(len(context.captured_queries))
+    return {
+        name: {
+            'p50_ms': round(statistics.median(times), 2),
+            'p99_ms': round(
+                statistics.quantiles(times, n=100, method='inclusive')[98], 2
+            ),
+            'queries': statistics.median_high(queries),
+        }
+        for name, (times, queries) in samples.items()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Печатает таблицу и возвращает список регрессий."""
+    regressions = []
+    print(f'{"сценарий":18}{"p50, мс":>10}{"p99, мс":>10}{"запросов":>10}'
+          f'{"p50 base":>10}{"Δp50":>8}')
+    for name, result in results.items():
+        base = baseline.get(name)
+        line = (f'{name:18}{result["p50_ms"]:>10.2f}'
+                f'{result["p99_ms"]:>10.2f}{result["queries"]:>10}')
+        if base is not None:
+            change = result['p50_ms'] / base['p50_ms'] - 1
+            line += f'{base["p50_ms"]:>10.2f}{change * 100:>7.0f}%'
+            if change > tolerance:
+                regressions.append(f'{name}: p50 {change * 100:+.0f}%')
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f'{name}: запросов {base["queries"]} -> '
+                    f'{result["queries"]}'
+                )
+        print(line)
+    return regressions
+
+
+def load_baseline(scale, seed):
+    if not BASELINE_PATH.exists():
+        return {}
+    baseline = json.loads(BASELINE_PATH.read_text())
+    if (baseline['scale'], baseline['seed']) != (scale, seed):
+        print(f'baseline снят при scale={baseline["scale"]}, '
+              f'seed={baseline["seed"]}: сравнение пропущено')
+        return {}
+    return baseline['scenarios']
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--fresh', action='store_true')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name, sizes = prepare_database(args.scale, args.seed, args.fresh)
+    try:
+        print(', '.join(f'{key}: {value}' for key, value in sizes.items()))
+        targets = find_targets()
+        client = Client()
+        client.force_login(targets['reader'])
+        # Пишущие сценарии коммитят как в работе; на миллионе постов
+        # добавленные ими десятки строк на следующие запуски не влияют.
+        with override_settings(WRITE_BUFFER=False):
+            scenarios = make_scenarios(targets)
+            # Прогревочный круг: файлы базы попадают в кеш ОС.
+            run(scenarios, client, 2)
+            results = run(scenarios, client, args.requests)
+    finally:
+        # База остаётся для следующих запусков.
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=True)
+
+    regressions = compare(
+        results, load_baseline(args.scale, args.seed), args.tolerance
+    )
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps({
+            'scale': args.scale,
+            'seed': args.seed,
+            'requests': args.requests,
+            'scenarios': results,
+        }, indent=2) + '\n')
+        print(f'baseline сохранён в {BASELINE_PATH.name}')
+    elif regressions:
+        print('Регрессии:\n' + '\n'.join(regressions))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
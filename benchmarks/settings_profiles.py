@@ -0,0 +1,97 @@
+"""
+Запуск и накладные расходы на запрос для профилей настроек dev и prod
+(DJANGO_ENV): время django.setup(), первого запроса, среднее время
+запроса к ленте, странице поста и профилю и пиковая память процесса.
+
+Каждый профиль измеряется в отдельном процессе. Запуск из корня
+репозитория:
+
+    python benchmarks/settings_profiles.py [--requests 300]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'yatube'
+PROFILES = ('dev', 'prod')
+POSTS = 30
+
+
+def child(requests):
+    started = time.perf_counter()
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark')
+    import django
+    django.setup()
+    setup_time = time.perf_counter() - started
+
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    from posts.models import Post, User
+
+    connection.creation.create_test_db(verbosity=0)
+    author = User.objects.create_user(username='author')
+    posts = [
+        Post.objects.create(text=f'Пост {number}', author=author)
+        for number in range(POSTS)
+    ]
+    urls = [
+        reverse('posts:index'),
+        reverse('posts:post_detail', args=[posts[0].id]),
+        reverse('posts:profile', args=[author.username]),
+    ]
+    client = Client()
+    started = time.perf_counter()
+    for url in urls:
+        client.get(url)
+    first_time = time.perf_counter() - started
+    started = time.perf_counter()
+    for number in range(requests):
+        client.get(urls[number % len(urls)])
+    request_time = (time.perf_counter() - started) / requests
+    print(json.dumps({
+        'setup_ms': setup_time * 1000,
+        'first_ms': first_time * 1000,
+        'request_ms': request_time * 1000,
+        'maxrss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests)
+        return
+    print(f'{"профиль":8}{"setup, мс":>11}{"первые, мс":>12}'
+          f'{"запрос, мс":>12}{"память, МБ":>12}')
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, __file__, '--child',
+             '--requests', str(args.requests)],
+            env={
+                **os.environ,
+                'DJANGO_ENV': profile,
+                'DJANGO_ALLOWED_HOSTS': 'testserver',
+            },
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{profile:8}{result["setup_ms"]:>11.0f}'
+              f'{result["first_ms"]:>12.0f}{result["request_ms"]:>12.2f}'
+              f'{result["maxrss_mb"]:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Время рендера главной страницы (10 карточек постов) для трёх
+вариантов загрузки шаблонов: без кеширующего загрузчика (dev),
+с кеширующим загрузчиком без прогрева (первый запрос воркера
+компилирует шаблоны) и с кеширующим загрузчиком после warm_up()
+при старте воркера (prod).
+
+Кеш фрагментов очищается перед каждым рендером, чтобы карточки
+рендерились заново. Запуск из корня репозитория:
+
+    python benchmarks/template_render.py [--renders 300]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from core import template_cache  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.template import engines  # noqa: E402
+from django.template.backends.django import DjangoTemplates  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from posts.models import Group, Post, User  # noqa: E402
+from posts.utils import pagination  # noqa: E402
+
+POSTS = 10
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+def make_engine(cached):
+    params = {
+        **settings.TEMPLATES[0], 'NAME': 'benchmark', 'APP_DIRS': False,
+    }
+    del params['BACKEND']
+    loaders = [('django.template.loaders.cached.Loader', LOADERS)]
+    params['OPTIONS'] = {
+        **params['OPTIONS'],
+        'loaders': loaders if cached else LOADERS,
+    }
+    return DjangoTemplates(params)
+
+
+def render(engine, context, request):
+    cache.clear()
+    return engine.get_template('posts/index.html').render(context, request)
+
+
+def measure(engine, context, request, renders, warm_up):
+    """Возвращает (старт воркера, первый рендер, средний рендер), мс."""
+    started = time.perf_counter()
+    if warm_up:
+        # warm_up() прогревает движки из settings.TEMPLATES.
+        with mock.patch.object(engines, 'all', return_value=[engine]):
+            template_cache.warm_up()
+    boot = time.perf_counter() - started
+    started = time.perf_counter()
+    render(engine, context, request)
+    first = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(renders):
+        render(engine, context, request)
+    average = (time.perf_counter() - started) / renders
+    return boot * 1000, first * 1000, average * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--renders', type=int, default=300)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        author = User.objects.create_user(username='author')
+        group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        for number in range(POSTS):
+            Post.objects.create(
+                text=f'Пост {number} ' * 20, author=author, group=group
+            )
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        page_obj = pagination(Post.objects.for_feed(), request)
+        # Страница загружается один раз: сравниваются только шаблоны.
+        page_obj.object_list = list(page_obj.object_list)
+        context = {'page_obj': page_obj}
+
+        print(f'{"загрузчик":26}{"старт, мс":>11}{"первый, мс":>12}'
+              f'{"рендер, мс":>12}')
+        for title, cached, warm_up in (
+            ('без кеша', False, False),
+            ('кеширующий', True, False),
+            ('кеширующий + warm_up', True, True),
+        ):
+            boot, first, average = measure(
+                make_engine(cached), context, request, args.renders, warm_up
+            )
+            print(f'{title:26}{boot:>11.1f}{first:>12.2f}{average:>12.2f}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
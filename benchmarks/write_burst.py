@@ -0,0 +1,100 @@
+"""
+Пропускная способность записи комментариев при всплеске нагрузки:
+каждая запись своей транзакцией (WRITE_BUFFER = False) и пачками
+через posts.write_buffer (WRITE_BUFFER = True).
+
+Потоки одновременно отправляют комментарии через представление
+add_comment в файловую базу SQLite, как воркеры сервера.
+
+Запуск из корня репозитория:
+
+    python benchmarks/write_burst.py [--threads 32] [--comments 20]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'yatube'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+os.environ.setdefault('SECRET_KEY', 'benchmark')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import OperationalError, connections  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from posts.models import Comment, Post, User  # noqa: E402
+
+
+def writer(client, url, comments):
+    """Отправляет комментарии; возвращает число неудачных запросов."""
+    failed = 0
+    for number in range(comments):
+        try:
+            client.post(url, {'text': f'comment {number}'})
+        except OperationalError:
+            failed += 1
+    connections.close_all()
+    return failed
+
+
+def measure(buffered, clients, url, comments):
+    Comment.objects.all().delete()
+    with override_settings(WRITE_BUFFER=buffered):
+        with ThreadPoolExecutor(len(clients)) as executor:
+            started = time.perf_counter()
+            failed = sum(executor.map(
+                lambda client: writer(client, url, comments), clients
+            ))
+            elapsed = time.perf_counter() - started
+    saved = Comment.objects.count()
+    return saved, failed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--comments', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_test_environment(debug=False)
+    # Ошибки «database is locked» считаются, а не печатаются.
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    connection = connections['default']
+    connection.settings_dict['TEST']['NAME'] = os.path.join(
+        tempfile.mkdtemp(), 'write_burst.sqlite3'
+    )
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        author = User.objects.create_user(username='author')
+        clients = []
+        for number in range(args.threads):
+            client = Client()
+            client.force_login(
+                User.objects.create_user(username=f'user_{number}')
+            )
+            clients.append(client)
+        post = Post.objects.create(text='Прямой эфир', author=author)
+        url = reverse('posts:add_comment', args=[post.id])
+        print(f'{"режим":10}{"сохранено":>11}{"ошибок":>8}'
+              f'{"время, с":>10}{"записей/с":>11}')
+        for title, buffered in (('по одной', False), ('пачками', True)):
+            saved, failed, elapsed = measure(
+                buffered, clients, url, args.comments
+            )
+            print(f'{title:10}{saved:>11}{failed:>8}'
+                  f'{elapsed:>10.2f}{saved / elapsed:>11.0f}')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
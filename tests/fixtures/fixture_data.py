@@ -9,6 +9,9 @@ from posts.models import Group, Post
 def mock_media(settings):
     with tempfile.TemporaryDirectory() as temp_directory:
         settings.MEDIA_ROOT = temp_directory
+        # Миниатюры синхронно: фоновый пул писал бы в каталог
+        # и после его удаления.
+        settings.POST_THUMBNAIL_WORKERS = 0
         yield temp_directory
 
 
@@ -0,0 +1,70 @@
+from django.core.exceptions import ValidationError
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'updated_at', 'version', 'author', 'group',
+    'image', 'comments_count',
+)
+COMMENT_FIELDS = (
+    'id', 'text', 'pub_date', 'updated_at', 'version', 'author',
+)
+
+
+def parse_fields(value, allowed):
+    """
+    Поля из параметра ?fields=a,b (разреженная выборка).
+
+    Без параметра — все поля; неизвестное поле — ValidationError.
+    """
+    if not value:
+        return allowed
+    fields = tuple(field for field in value.split(',') if field)
+    unknown = set(fields) - set(allowed)
+    if unknown:
+        raise ValidationError(
+            'Неизвестные поля: %(fields)s',
+            params={'fields': ', '.join(sorted(unknown))},
+        )
+    return fields
+
+
+def serialize_user(user):
+    return {
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }
+
+
+def serialize_group(group):
+    if group is None:
+        return None
+    return {'slug': group.slug, 'title': group.title}
+
+
+POST_SERIALIZERS = {
+    'id': lambda post: post.id,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date,
+    'updated_at': lambda post: post.updated_at,
+    'version': lambda post: post.version,
+    'author': lambda post: serialize_user(post.author),
+    'group': lambda post: serialize_group(post.group),
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+COMMENT_SERIALIZERS = {
+    'id': lambda comment: comment.id,
+    'text': lambda comment: comment.text,
+    'pub_date': lambda comment: comment.pub_date,
+    'updated_at': lambda comment: comment.updated_at,
+    'version': lambda comment: comment.version,
+    'author': lambda comment: serialize_user(comment.author),
+}
+
+
+def serialize_post(post, fields=POST_FIELDS):
+    return {field: POST_SERIALIZERS[field](post) for field in fields}
+
+
+def serialize_comment(comment, fields=COMMENT_FIELDS):
+    return {field: COMMENT_SERIALIZERS[field](comment) for field in fields}
@@ -0,0 +1,148 @@
+import json
+from datetime import timedelta
+from unittest import mock
+
+from core.testing import run_on_commit
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Comment, Follow, Group, Post, User
+
+from yatube.settings import NUMBER_OF_POSTS
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        for n in range(NUMBER_OF_POSTS + 3):
+            Post.objects.create(
+                text=f'test_post {n}', author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.latest('pub_date', 'id')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.reader)
+
+    def test_feeds_paginated_by_cursor(self):
+        """Ленты отдают все посты ровно по разу, следуя ссылкам next."""
+        urls = (
+            reverse('api:index'),
+            reverse('api:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('api:profile_posts', kwargs={'username': 'author'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                ids = []
+                while url:
+                    data = self.guest_client.get(url).json()
+                    self.assertLessEqual(len(data['results']), NUMBER_OF_POSTS)
+                    ids += [post['id'] for post in data['results']]
+                    url = data['next']
+                self.assertEqual(
+                    ids,
+                    list(Post.objects.order_by('-pub_date', '-id')
+                         .values_list('id', flat=True)),
+                )
+
+    def test_sparse_fields(self):
+        """?fields= ограничивает поля, неизвестное поле — ошибка 400."""
+        url = reverse('api:post_detail', kwargs={'post_id': self.post.id})
+        response = self.guest_client.get(url, {'fields': 'id,author'})
+        self.assertEqual(response.json(), {
+            'id': self.post.id,
+            'author': {
+                'username': 'author', 'first_name': '', 'last_name': '',
+            },
+        })
+        response = self.guest_client.get(url, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_get(self):
+        """Повтор запроса с ETag или Last-Modified получает 304."""
+        url = reverse('api:post_detail', kwargs={'post_id': self.post.id})
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        not_modified = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        not_modified = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_new_comment_changes_last_modified(self):
+        """
+        Новый комментарий меняет comments_count без updated_at поста:
+        повтор с If-Modified-Since получает свежие данные, а не 304.
+        """
+        urls = (
+            reverse('api:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('api:index'),
+        )
+        responses = [self.guest_client.get(url) for url in urls]
+        later = timezone.now() + timedelta(minutes=1)
+        with mock.patch.object(timezone, 'now', return_value=later):
+            with run_on_commit():
+                Comment.objects.create(
+                    post=self.post, author=self.reader, text='test_comment'
+                )
+        for url, response in zip(urls, responses):
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_add_comment(self):
+        """Комментировать может только авторизованный пользователь."""
+        url = reverse('api:comments', kwargs={'post_id': self.post.id})
+        data = json.dumps({'text': 'test_comment'})
+        response = self.guest_client.post(
+            url, data, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 401)
+        response = self.authorized_client.post(
+            url, data, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author']['username'], 'reader')
+        self.assertTrue(Comment.objects.filter(
+            post=self.post, author=self.reader, text='test_comment'
+        ).exists())
+        results = self.guest_client.get(url).json()['results']
+        self.assertEqual(
+            [comment['text'] for comment in results], ['test_comment']
+        )
+
+    def test_follow_and_unfollow(self):
+        """Подписка создаёт Follow и наполняет ленту, отписка удаляет."""
+        url = reverse('api:follow', kwargs={'username': 'author'})
+        self.assertEqual(self.guest_client.post(url).status_code, 401)
+        self.assertEqual(self.authorized_client.post(url).status_code, 201)
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        feed = self.authorized_client.get(reverse('api:follow_posts')).json()
+        self.assertEqual(len(feed['results']), NUMBER_OF_POSTS)
+        self.assertEqual(self.authorized_client.delete(url).status_code, 204)
+        self.assertFalse(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        self_url = reverse('api:follow', kwargs={'username': 'reader'})
+        self.assertEqual(
+            self.authorized_client.post(self_url).status_code, 400
+        )
@@ -0,0 +1,201 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET, require_http_methods
+from posts.caching import content_changed
+from posts.forms import CommentForm
+from posts.models import Follow, Group, Post, User
+from posts.timeline import follow_feed
+from posts.utils import KeysetPaginator
+
+from yatube.settings import NUMBER_OF_POSTS
+
+from .serializers import (COMMENT_FIELDS, POST_FIELDS, parse_fields,
+                          serialize_comment, serialize_post)
+
+
+def json_response(request, data, status=200, last_modified=None):
+    """
+    Компактный JSON с ETag (хеш тела) и Last-Modified.
+
+    На условный GET с совпавшим ETag или неизменившейся датой
+    отвечает 304 без тела.
+    """
+    body = json.dumps(
+        data, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+    etag = quote_etag(hashlib.md5(body).hexdigest())
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = None
+    if request.method == 'GET' and status == 200:
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+    if response is None:
+        response = HttpResponse(
+            body, status=status, content_type='application/json'
+        )
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def last_modified(*dates):
+    """
+    Самая поздняя из дат или время последней правки, которую не видно
+    по updated_at (content_changed): нового комментария, удаления.
+    """
+    return max(date for date in [*dates, content_changed()] if date)
+
+
+def error_response(request, status, message):
+    return json_response(request, {'error': message}, status=status)
+
+
+def api_login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error_response(request, 401, 'Требуется авторизация')
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def keyset_response(request, queryset, allowed_fields, serialize,
+                    ordering=('-pub_date', '-id')):
+    """Страница списка по курсору ?cursor= с полями ?fields=."""
+    try:
+        fields = parse_fields(request.GET.get('fields'), allowed_fields)
+    except ValidationError as error:
+        return error_response(request, 400, error.messages[0])
+    page = KeysetPaginator(queryset, NUMBER_OF_POSTS, ordering).get_page(
+        request.GET.get('cursor')
+    )
+    return json_response(
+        request,
+        {
+            'results': [serialize(obj, fields) for obj in page],
+            'next': page_url(request, page.next_cursor),
+            'previous': page_url(request, page.previous_cursor),
+        },
+        last_modified=last_modified(*(obj.updated_at for obj in page)),
+    )
+
+
+def posts_response(request, queryset):
+    return keyset_response(request, queryset, POST_FIELDS, serialize_post)
+
+
+@require_GET
+def index(request):
+    return posts_response(request, Post.objects.for_feed())
+
+
+@require_GET
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return posts_response(request, Post.objects.for_feed().filter(group=group))
+
+
+@require_GET
+def profile_posts(request, username):
+    author = get_object_or_404(User, username=username)
+    return posts_response(
+        request, Post.objects.for_feed().filter(author=author)
+    )
+
+
+@require_GET
+@api_login_required
+def follow_posts(request):
+    return posts_response(request, follow_feed(request.user).for_feed())
+
+
+@require_GET
+def post_detail(request, post_id):
+    post = get_object_or_404(Post.objects.for_feed(), id=post_id)
+    try:
+        fields = parse_fields(request.GET.get('fields'), POST_FIELDS)
+    except ValidationError as error:
+        return error_response(request, 400, error.messages[0])
+    return json_response(
+        request,
+        serialize_post(post, fields),
+        last_modified=last_modified(post.updated_at),
+    )
+
+
+@require_http_methods(['GET', 'POST'])
+def comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    if request.method == 'POST':
+        return add_comment(request, post)
+    return keyset_response(
+        request,
+        post.comments.select_related('author'),
+        COMMENT_FIELDS,
+        serialize_comment,
+        ordering=('pub_date', 'id'),
+    )
+
+
+@api_login_required
+@transaction.atomic
+def add_comment(request, post):
+    data = request_data(request)
+    if data is None:
+        return error_response(request, 400, 'Некорректный JSON')
+    form = CommentForm(data)
+    if not form.is_valid():
+        return json_response(request, {'errors': form.errors}, status=400)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post = post
+    comment.save()
+    return json_response(request, serialize_comment(comment), status=201)
+
+
+@require_http_methods(['POST', 'DELETE'])
+@api_login_required
+@transaction.atomic
+def follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if request.method == 'DELETE':
+        Follow.objects.filter(user=request.user, author=author).delete()
+        return HttpResponse(status=204)
+    if author == request.user:
+        return error_response(request, 400, 'Нельзя подписаться на себя')
+    _, created = Follow.objects.get_or_create(
+        user=request.user, author=author
+    )
+    return json_response(
+        request,
+        {'author': author.username, 'following': True},
+        status=201 if created else 200,
+    )
@@ -0,0 +1,219 @@
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+from . import metrics
+
+GENERATION_KEY = 'tiered:generation'
+MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Двухуровневый кеш: L1 в памяти процесса и общий для всех
+    воркеров L2 (memcached, Redis и т.п., алиас из CACHES).
+
+    Чтение идёт сначала в L1, промах дочитывается из L2 и
+    запоминается в L1 не дольше LOCAL_TIMEOUT секунд — это и есть
+    максимальная задержка, с которой другой воркер увидит изменение
+    ключа. Все ключи содержат «поколение», хранящееся в L2: clear()
+    меняет поколение, и старые записи перестают читаться сразу во
+    всех воркерах (поколение перечитывается раз в
+    GENERATION_CHECK_INTERVAL секунд).
+
+    Ключи, версии и префиксы обрабатывают нижележащие бэкенды,
+    поэтому KEY_PREFIX и VERSION задаются у алиаса L2.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_CACHE', 'shared')
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self.generation_check_interval = options.get(
+            'GENERATION_CHECK_INTERVAL', 1
+        )
+        self.local = LocMemCache(
+            f'tiered:{location}',
+            {'OPTIONS': {
+                'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000),
+            }},
+        )
+        self._generation = None
+        self._generation_checked_at = 0
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @property
+    def generation(self):
+        now = time.monotonic()
+        if (self._generation is None
+                or now - self._generation_checked_at
+                > self.generation_check_interval):
+            generation = self.shared.get(GENERATION_KEY)
+            if generation is None:
+                generation = time.time_ns()
+                if not self.shared.add(GENERATION_KEY, generation, None):
+                    generation = self.shared.get(GENERATION_KEY, generation)
+            if generation != self._generation:
+                self.local.clear()
+            self._generation = generation
+            self._generation_checked_at = now
+        return self._generation
+
+    def _key(self, key):
+        return f'{self.generation}:{key}'
+
+    def _local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key)
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self.local.set(key, value, self._local_timeout(timeout), version)
+        return added
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key)
+        value = self.local.get(key, MISSING, version)
+        if value is not MISSING:
+            return value
+        value = self.shared.get(key, MISSING, version)
+        if value is MISSING:
+            return default
+        self.local.set(key, value, self.local_timeout, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key)
+        self.shared.set(key, value, timeout, version)
+        self.local.set(key, value, self._local_timeout(timeout), version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key)
+        self.local.delete(key, version)
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        key = self._key(key)
+        self.local.delete(key, version)
+        return self.shared.delete(key, version)
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key): key for key in keys}
+        found = self.local.get_many(keys, version)
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared_found = self.shared.get_many(missing, version)
+            for key, value in shared_found.items():
+                self.local.set(key, value, self.local_timeout, version)
+            found.update(shared_found)
+        return {keys[key]: value for key, value in found.items()}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        data = {self._key(key): value for key, value in data.items()}
+        self.local.set_many(data, self._local_timeout(timeout), version)
+        return self.shared.set_many(data, timeout, version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key) for key in keys]
+        self.local.delete_many(keys, version)
+        self.shared.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        key = self._key(key)
+        return (
+            self.local.has_key(key, version)
+            or self.shared.has_key(key, version)
+        )
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key)
+        self.local.delete(key, version)
+        return self.shared.incr(key, delta, version)
+
+    def clear(self):
+        """Сбрасывает кеш во всех воркерах сменой поколения."""
+        generation = time.time_ns()
+        self.shared.set(GENERATION_KEY, generation, None)
+        self.local.clear()
+        self._generation = generation
+        self._generation_checked_at = time.monotonic()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+class InstrumentedCache(BaseCache):
+    """
+    Обёртка над кешем из алиаса OPTIONS['CACHE'], которая считает
+    попадания и промахи чтений для core.metrics.
+
+    Ключи, версии и префиксы обрабатывает обёрнутый бэкенд.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self.cache_alias = params.get('OPTIONS', {}).get('CACHE')
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.cache.add(key, value, timeout, version)
+
+    def get(self, key, default=None, version=None):
+        value = self.cache.get(key, MISSING, version)
+        metrics.record_cache(value is not MISSING)
+        return default if value is MISSING else value
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT, version=None):
+        value = self.get(key, version=version)
+        if value is not None:
+            return value
+        return self.cache.get_or_set(key, default, timeout, version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.cache.set(key, value, timeout, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.cache.touch(key, timeout, version)
+
+    def delete(self, key, version=None):
+        return self.cache.delete(key, version)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        found = self.cache.get_many(keys, version)
+        for key in keys:
+            metrics.record_cache(key in found)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.cache.set_many(data, timeout, version)
+
+    def delete_many(self, keys, version=None):
+        self.cache.delete_many(keys, version)
+
+    def has_key(self, key, version=None):
+        return self.cache.has_key(key, version)
+
+    def incr(self, key, delta=1, version=None):
+        return self.cache.incr(key, delta, version)
+
+    def decr(self, key, delta=1, version=None):
+        return self.cache.decr(key, delta, version)
+
+    def clear(self):
+        self.cache.clear()
+
+    def close(self, **kwargs):
+        self.cache.close(**kwargs)
@@ -0,0 +1,240 @@
+"""
+Метрики запросов: время ответа, число и время запросов к БД, время
+рендера шаблонов и попадания в кеш по представлениям.
+
+Значения копятся в памяти процесса (MetricsMiddleware) и отдаются
+в текстовом формате Prometheus (render_prometheus). У каждого воркера
+свои метрики, поэтому Prometheus должен опрашивать воркеры по
+отдельности или складывать их ряды.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _format_labels(labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels)
+
+
+class Histogram:
+    """Гистограмма в духе Prometheus: счётчики по корзинам, сумма, число."""
+    kind = 'histogram'
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._values = defaultdict(
+            lambda: [[0] * (len(self.buckets) + 1), 0, 0]
+        )
+
+    def observe(self, value, **labels):
+        with self._lock:
+            counts, _, _ = series = self._values[tuple(labels.items())]
+            counts[bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            values = {
+                labels: (list(counts), total, count)
+                for labels, (counts, total, count) in self._values.items()
+            }
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(
+                [*self.buckets, '+Inf'], counts
+            ):
+                cumulative += bucket_count
+                yield (
+                    f'{self.name}_bucket',
+                    (*labels, ('le', bound)),
+                    cumulative,
+                )
+            yield f'{self.name}_sum', labels, total
+            yield f'{self.name}_count', labels, count
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        self._values = defaultdict(int)
+
+    def inc(self, amount=1, **labels):
+        with self._lock:
+            self._values[tuple(labels.items())] += amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, labels, value
+
+
+REQUEST_DURATION = Histogram(
+    'yatube_request_duration_seconds',
+    'Время ответа представления',
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'yatube_db_queries',
+    'Число запросов к БД за один ответ',
+    QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'yatube_db_duration_seconds',
+    'Время запросов к БД за один ответ',
+    DURATION_BUCKETS,
+)
+TEMPLATE_DURATION = Histogram(
+    'yatube_template_render_seconds',
+    'Время рендера шаблонов за один ответ',
+    DURATION_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'yatube_cache_requests_total',
+    'Чтения из кеша по результату (hit или miss)',
+)
+SLOW_REQUESTS = Counter(
+    'yatube_slow_requests_total',
+    'Ответы дольше METRICS_SLOW_REQUEST_SECONDS',
+)
+METRICS = (
+    REQUEST_DURATION, DB_QUERIES, DB_DURATION, TEMPLATE_DURATION,
+    CACHE_REQUESTS, SLOW_REQUESTS,
+)
+
+
+class RequestMetrics:
+    """Замеры одного запроса; доступны текущему потоку через current()."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0
+        self.sql = []
+        self.render_time = 0
+        self.render_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+def start_request():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def finish_request(request_metrics, view_name):
+    """Записывает замеры запроса в метрики и логирует медленный."""
+    _local.metrics = None
+    duration = time.perf_counter() - request_metrics.started
+    REQUEST_DURATION.observe(duration, view=view_name)
+    DB_QUERIES.observe(request_metrics.queries, view=view_name)
+    DB_DURATION.observe(request_metrics.db_time, view=view_name)
+    TEMPLATE_DURATION.observe(request_metrics.render_time, view=view_name)
+    if request_metrics.cache_hits:
+        CACHE_REQUESTS.inc(
+            request_metrics.cache_hits, view=view_name, result='hit'
+        )
+    if request_metrics.cache_misses:
+        CACHE_REQUESTS.inc(
+            request_metrics.cache_misses, view=view_name, result='miss'
+        )
+    if duration >= settings.METRICS_SLOW_REQUEST_SECONDS:
+        SLOW_REQUESTS.inc(view=view_name)
+        log_slow_request(request_metrics, view_name, duration)
+
+
+def log_slow_request(request_metrics, view_name, duration):
+    slowest = sorted(
+        request_metrics.sql, key=lambda query: query[1], reverse=True
+    )[:settings.METRICS_SLOW_SQL_LIMIT]
+    logger.warning(
+        'Медленный ответ %s: %.3f с, запросов к БД %s (%.3f с), '
+        'рендер %.3f с\n%s',
+        view_name, duration, request_metrics.queries,
+        request_metrics.db_time, request_metrics.render_time,
+        '\n'.join(f'{seconds:.4f} с: {sql}' for sql, seconds in slowest),
+    )
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper: время и текст запроса к БД."""
+    request_metrics = current()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        request_metrics.queries += 1
+        request_metrics.db_time += duration
+        if len(request_metrics.sql) < settings.METRICS_SQL_CAPTURE_LIMIT:
+            request_metrics.sql.append((sql, duration))
+
+
+@contextmanager
+def timed_render():
+    """
+    Засекает рендер шаблона. Вложенные рендеры (render_to_string
+    внутри тега) уже входят во внешний и отдельно не считаются.
+    """
+    request_metrics = current()
+    if request_metrics is None:
+        yield
+        return
+    request_metrics.render_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.render_depth -= 1
+        if not request_metrics.render_depth:
+            request_metrics.render_time += time.perf_counter() - started
+
+
+def record_cache(hit):
+    request_metrics = current()
+    if request_metrics is None:
+        return
+    if hit:
+        request_metrics.cache_hits += 1
+    else:
+        request_metrics.cache_misses += 1
+
+
+def render_prometheus():
+    """Все метрики процесса в текстовом формате Prometheus."""
+    lines = []
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.description}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.samples():
+            if labels:
+                name = f'{name}{{{_format_labels(labels)}}}'
+            lines.append(f'{name} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,37 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics
+
+UNRESOLVED_VIEW = 'unresolved'
+
+
+class MetricsMiddleware:
+    """
+    Замеряет каждый запрос для core.metrics: общее время, запросы
+    к БД (execute_wrapper), рендер шаблонов и чтения из кеша.
+    Стоит первым в MIDDLEWARE, чтобы учитывать и остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.start_request()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.record_query)
+                    )
+                return self.get_response(request)
+        finally:
+            match = request.resolver_match
+            metrics.finish_request(
+                request_metrics, match.view_name if match else UNRESOLVED_VIEW
+            )
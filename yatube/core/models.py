@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 
 
 class CreatedModel(models.Model):
@@ -6,6 +7,33 @@ class CreatedModel(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        verbose_name='Версия'
+    )
 
     class Meta:
         abstract = True
+
+    def save(self, *args, **kwargs):
+        """
+        Каждое сохранение существующей записи увеличивает version
+        на единицу в самой базе, так что параллельные правки получают
+        разные версии.
+        """
+        if self._state.adding:
+            super().save(*args, **kwargs)
+            return
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {
+                *update_fields, 'updated_at', 'version'
+            }
+        self.version = F('version') + 1
+        super().save(*args, **kwargs)
+        self.refresh_from_db(fields=['version'])
@@ -0,0 +1,23 @@
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import metrics
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        with metrics.timed_render():
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates, который засекает рендер шаблонов для core.metrics."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            super().from_string(template_code).template, self
+        )
+
+    def get_template(self, template_name):
+        return InstrumentedTemplate(
+            super().get_template(template_name).template, self
+        )
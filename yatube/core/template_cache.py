@@ -0,0 +1,41 @@
+import logging
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.utils import get_app_template_dirs
+
+logger = logging.getLogger(__name__)
+
+
+def template_names(engine):
+    """Имена всех шаблонов из DIRS движка и каталогов templates приложений."""
+    names = set()
+    for directory in [
+        *engine.engine.dirs, *get_app_template_dirs('templates')
+    ]:
+        for root, _, files in os.walk(directory):
+            for file_name in files:
+                path = os.path.join(root, file_name)
+                name = os.path.relpath(path, directory)
+                names.add(name.replace(os.sep, '/'))
+    return sorted(names)
+
+
+def warm_up():
+    """
+    Компилирует все шаблоны, чтобы кеширующий загрузчик хранил их
+    до первого запроса; вызывается при старте воркера (yatube.wsgi).
+
+    Возвращает число скомпилированных шаблонов.
+    """
+    compiled = 0
+    for engine in engines.all():
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError,
+                    UnicodeDecodeError) as error:
+                logger.debug('Шаблон %s не скомпилирован: %s', name, error)
+            else:
+                compiled += 1
+    return compiled
@@ -6,3 +6,12 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **params):
+    """Строка запроса текущей страницы с заменёнными параметрами."""
+    query = context['request'].GET.copy()
+    for key, value in params.items():
+        query[key] = value
+    return '?' + query.urlencode()
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def run_on_commit():
+    """
+    Выполняет колбэки transaction.on_commit, поставленные внутри блока.
+
+    TestCase не коммитит свою транзакцию, и сами колбэки в нём
+    не срабатывают (captureOnCommitCallbacks есть только с Django 3.2).
+    """
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
@@ -0,0 +1,184 @@
+import os
+import runpy
+from unittest import mock
+
+from core.cache import TieredCache
+from core.template_cache import warm_up
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.template import engines
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared-stand-in',
+    },
+}
+
+
+def make_worker_cache(name):
+    """Кеш отдельного воркера: свой L1, общий L2 'shared'."""
+    return TieredCache(name, {'OPTIONS': {
+        'SHARED_CACHE': 'shared',
+        'LOCAL_TIMEOUT': 60,
+        'GENERATION_CHECK_INTERVAL': 0,
+    }})
+
+
+@override_settings(CACHES=SHARED_CACHES)
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.worker_1 = make_worker_cache('worker_1')
+        self.worker_2 = make_worker_cache('worker_2')
+        self.worker_1.local.clear()
+        self.worker_2.local.clear()
+
+    def test_value_shared_between_workers(self):
+        """Значение, записанное одним воркером, видно другому."""
+        self.worker_1.set('key', 'value')
+        self.assertEqual(self.worker_2.get('key'), 'value')
+        self.assertEqual(
+            self.worker_2.get_many(['key', 'missing']), {'key': 'value'}
+        )
+
+    def test_local_tier_serves_repeated_reads(self):
+        """Повторное чтение обслуживается L1 без обращения к L2."""
+        self.worker_1.set('key', 'value')
+        self.worker_2.get('key')
+        caches['shared'].delete(self.worker_2._key('key'))
+        self.assertEqual(self.worker_2.get('key'), 'value')
+
+    def test_clear_invalidates_all_workers(self):
+        """clear() одного воркера сбрасывает L1 и L2 всех воркеров."""
+        self.worker_1.set('key', 'value')
+        self.assertEqual(self.worker_2.get('key'), 'value')
+        self.worker_1.clear()
+        self.assertIsNone(self.worker_2.get('key'))
+        self.assertIsNone(self.worker_1.get('key'))
+
+    def test_incr_goes_to_shared_tier(self):
+        """incr выполняется в общем кеше и виден всем воркерам."""
+        self.worker_1.set('counter', 1)
+        self.assertEqual(self.worker_2.get('counter'), 1)
+        self.assertEqual(self.worker_2.incr('counter'), 2)
+        self.assertEqual(self.worker_1.incr('counter'), 3)
+        with self.assertRaises(ValueError):
+            self.worker_1.incr('missing')
+
+
+class SQLitePragmasTests(TestCase):
+    def test_pragmas_applied_to_connection(self):
+        """Соединение SQLite получает настройки из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            # 1 — NORMAL
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(
+                cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout']
+            )
+
+
+class SettingsProfileTests(SimpleTestCase):
+    @staticmethod
+    def load_settings(**environ):
+        """Настройки base, вычисленные заново с переменными окружения."""
+        with mock.patch.dict(os.environ, environ):
+            return runpy.run_module('yatube.settings.base')
+
+    def test_sqlite_profile_uses_fts5_search(self):
+        profile = self.load_settings(DB_ENGINE='sqlite')
+        self.assertEqual(
+            profile['DATABASES']['default']['ENGINE'],
+            'django.db.backends.sqlite3',
+        )
+        self.assertEqual(
+            profile['POST_SEARCH_BACKEND'], 'posts.search.SQLiteFTS5Backend'
+        )
+
+    def test_postgresql_profile_uses_like_search(self):
+        """На PostgreSQL нет таблицы FTS5: поиск идёт без индекса."""
+        profile = self.load_settings(DB_ENGINE='postgresql')
+        self.assertEqual(
+            profile['DATABASES']['default']['ENGINE'],
+            'django.db.backends.postgresql',
+        )
+        self.assertEqual(
+            profile['POST_SEARCH_BACKEND'], 'posts.search.LikeSearchBackend'
+        )
+
+
+class TemplateWarmUpTests(SimpleTestCase):
+    @override_settings(TEMPLATES=[{
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [settings.TEMPLATES_DIR],
+        'OPTIONS': {
+            'loaders': [(
+                'django.template.loaders.cached.Loader',
+                [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ],
+            )],
+        },
+    }])
+    def test_warm_up_fills_cached_loader(self):
+        """warm_up() компилирует шаблоны в кеш загрузчика заранее."""
+        engine = engines.all()[0].engine
+        loader = engine.template_loaders[0]
+        self.assertNotIn('posts/index.html', loader.get_template_cache)
+        self.assertGreater(warm_up(), 0)
+        self.assertIn('posts/index.html', loader.get_template_cache)
+        self.assertIn('base.html', loader.get_template_cache)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.client = Client()
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_view_metrics_exported(self):
+        """
+        После запроса /metrics отдаёт время, запросы к БД и рендер
+        шаблонов этого представления.
+        """
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        for metric in (
+            'yatube_request_duration_seconds_count',
+            'yatube_db_queries_count',
+            'yatube_template_render_seconds_count',
+        ):
+            with self.subTest(metric=metric):
+                self.assertIn(f'{metric}{{view="posts:index"}}', content)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_metrics_hidden_from_other_addresses(self):
+        """Посторонним адресам /metrics отвечает 404."""
+        response = Client(REMOTE_ADDR='10.0.0.1').get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_metrics_closed_by_default(self):
+        """
+        Без METRICS_ALLOWED_IPS /metrics закрыт и для 127.0.0.1:
+        за прокси на той же машине это адрес любого запроса.
+        """
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(METRICS_SLOW_REQUEST_SECONDS=0)
+    def test_slow_request_logged_with_sql(self):
+        """Медленный ответ пишется в лог вместе с его SQL."""
+        with self.assertLogs('core.metrics', 'WARNING') as logs:
+            self.client.get(reverse('posts:index'))
+        self.assertIn('posts:index', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
@@ -0,0 +1,49 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class OversizedUploadedFile(UploadedFile):
+    """
+    Заглушка вместо файла больше FILE_UPLOAD_MAX_SIZE: содержимое
+    не сохраняется, поле формы само сообщает об ошибке.
+    """
+
+    oversized = True
+
+    def __init__(self, name, content_type, size, charset=None):
+        super().__init__(BytesIO(), name, content_type, size, charset)
+
+
+class SizeLimitUploadHandler(FileUploadHandler):
+    """
+    Первый в FILE_UPLOAD_HANDLERS: считает байты каждого файла и, как
+    только файл превысил FILE_UPLOAD_MAX_SIZE, перестаёт передавать его
+    следующим обработчикам. Остаток файла дочитывается из запроса и
+    отбрасывается, поэтому ни память, ни диск не заполняются.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.oversized = bool(
+            self.content_length
+            and self.content_length > settings.FILE_UPLOAD_MAX_SIZE
+        )
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.FILE_UPLOAD_MAX_SIZE:
+            self.oversized = True
+        if self.oversized:
+            return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not self.oversized:
+            return None
+        return OversizedUploadedFile(
+            self.file_name, self.content_type, self.received, self.charset
+        )
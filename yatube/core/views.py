@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from django.shortcuts import render
 
+from .metrics import render_prometheus
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +19,16 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def metrics(request):
+    """
+    Метрики процесса в формате Prometheus. Доступны только с адресов
+    METRICS_ALLOWED_IPS и персоналу, остальным — 404.
+    """
+    if (request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS
+            and not request.user.is_staff):
+        raise Http404
+    return HttpResponse(
+        render_prometheus(), content_type='text/plain; version=0.0.4'
+    )
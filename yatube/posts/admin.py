@@ -1,6 +1,44 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 
+from .counting import EstimatedCountPaginator
 from .models import Group, Post
+from .search import get_search_backend
+
+
+class LoadedAutocompleteSelect(AutocompleteSelect):
+    """
+    AutocompleteSelect, который берёт подпись выбранного значения у уже
+    загруженного объекта (selected), а не отдельным запросом на каждую
+    строку списка с list_editable.
+    """
+
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        if self.selected is None or value != [str(self.selected.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        options.append(self.create_option(
+            name,
+            self.selected.pk,
+            self.choices.field.label_from_instance(self.selected),
+            True,
+            len(options),
+        ))
+        return [(None, options, 0)]
+
+
+class PostChangelistForm(forms.ModelForm):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, LoadedAutocompleteSelect):
+                widget.selected = getattr(self.instance, name)
 
 
 @admin.register(Post)
@@ -10,9 +48,35 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
     list_editable = ('group',)
+    # Большая таблица постов: без COUNT(*) всей таблицы, без N+1
+    # по авторам и группам и без <select> со всеми группами в строке.
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = LoadedAutocompleteSelect(
+                db_field.remote_field,
+                self.admin_site,
+                using=kwargs.get('using'),
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangelistForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту идёт через поисковый индекс (posts.search)."""
+        if not search_term:
+            return queryset, False
+        return get_search_backend().search(queryset, search_term), False
 
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description')
     list_filter = ('title',)
+    search_fields = ('title',)
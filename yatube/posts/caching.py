@@ -0,0 +1,163 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_cookie
+
+from .models import Post
+
+POST_CARD_FRAGMENT = 'post_card'
+# Имена URL, на которых рисуется карточка поста: от страницы зависит
+# ссылка «все посты пользователя», поэтому фрагменты хранятся раздельно.
+POST_CARD_VIEWS = (
+    'index', 'group_list', 'profile', 'follow_index', 'search'
+)
+INDEX_PAGE_VERSION_KEY = 'posts:index_page:version'
+CONTENT_CHANGED_KEY = 'posts:content_changed'
+
+
+def post_card_keys(post_id, version, comments_count):
+    return [
+        make_template_fragment_key(
+            POST_CARD_FRAGMENT,
+            [post_id, version, comments_count, thumbnails_ready, view_name],
+        )
+        for thumbnails_ready in (True, False)
+        for view_name in POST_CARD_VIEWS
+    ]
+
+
+def invalidate_post_cards(post_ids):
+    """
+    Сбрасывает карточки постов после правок, которых нет в ключе
+    фрагмента, — имени автора.
+
+    Правка поста, его комментарии и готовность миниатюр меняют сам
+    ключ (version, comments_count, thumbnails_ready), поэтому
+    не зависят от того, дошло ли удаление до L1 каждого воркера
+    (core.cache.TieredCache).
+    """
+    keys = []
+    for post_id, version, comments_count in Post.objects.filter(
+        pk__in=post_ids
+    ).values_list('id', 'version', 'comments_count'):
+        keys.extend(post_card_keys(post_id, version, comments_count))
+    cache.delete_many(keys)
+
+
+def index_page_version():
+    return cache.get_or_set(INDEX_PAGE_VERSION_KEY, time.time_ns, None)
+
+
+def invalidate_index_page():
+    """
+    Сбрасывает закешированную главную страницу.
+
+    Ключи cache_page зависят от URL, поэтому вместо удаления
+    меняется префикс: старые записи просто истекут.
+    """
+    try:
+        cache.incr(INDEX_PAGE_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_PAGE_VERSION_KEY, time.time_ns(), None)
+
+
+def cache_index_page(timeout):
+    """
+    cache_page с префиксом ключа, который меняет invalidate_index_page.
+
+    Страница зависит от пользователя, поэтому кешируется отдельно
+    для каждой cookie сессии.
+
+    На условный запрос к закешированной странице отвечает 304 по её
+    собственным ETag и Last-Modified: страница в кеше может быть
+    старше валидаторов, посчитанных по базе.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key_prefix = f'index_page:{index_page_version()}'
+            cached_view = cache_page(timeout, key_prefix=key_prefix)(
+                vary_on_cookie(view)
+            )
+            response = cached_view(request, *args, **kwargs)
+            return get_conditional_response(
+                request,
+                etag=response.get('ETag'),
+                last_modified=parse_http_date_safe(
+                    response.get('Last-Modified')
+                ),
+                response=response,
+            )
+        return wrapper
+    return decorator
+
+
+def content_changed():
+    """
+    Время последней правки, которую не видно по updated_at
+    в показываемых постах: удаления поста или комментария, переноса
+    поста в другую группу, нового комментария (меняет счётчик
+    на карточках), правки группы или автора.
+
+    Если ключ вытеснен из кеша, временем правки считается текущее:
+    валидаторы страниц устаревают, но не отдают старое содержимое.
+    """
+    return cache.get_or_set(CONTENT_CHANGED_KEY, timezone.now, None)
+
+
+def touch_content():
+    cache.set(CONTENT_CHANGED_KEY, timezone.now(), None)
+
+
+def touch_content_on_commit():
+    """
+    touch_content после коммита текущей транзакции: до него
+    параллельный запрос связал бы новую отметку со старыми данными.
+    """
+    transaction.on_commit(touch_content)
+
+
+def conditional_page(validators):
+    """
+    Отвечает 304 на условный GET до вызова представления.
+
+    validators(request, *args, **kwargs) возвращает пару (key,
+    last_modified) или None, если страницы нет (тогда вызывается
+    представление, чтобы вернуть 404). ETag — хеш key и пользователя:
+    страницы для гостя и для авторизованного различаются.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            state = validators(request, *args, **kwargs)
+            if state is None:
+                return view(request, *args, **kwargs)
+            key, last_modified = state
+            etag = quote_etag(hashlib.md5(
+                f'{request.user.pk}:{key}:{last_modified}'.encode()
+            ).hexdigest())
+            timestamp = int(last_modified.timestamp())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(timestamp)
+                # Браузер должен каждый раз спрашивать сервер, а не
+                # показывать страницу, устаревшую после правки.
+                patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
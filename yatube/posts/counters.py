@@ -0,0 +1,80 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, User, UserCounters
+
+
+def _count_subquery(queryset, field, outer_field='pk'):
+    counts = queryset.filter(
+        **{field: OuterRef(outer_field)}
+    ).order_by().values(field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _not_below_zero(deltas):
+    """Условие, не дающее уйти счётчику в минус при расхождении."""
+    return {
+        f'{field}__gte': -delta for field, delta in deltas.items() if delta < 0
+    }
+
+
+def get_user_counters(user):
+    try:
+        return user.counters
+    except UserCounters.DoesNotExist:
+        recount_users(User.objects.filter(pk=user.pk))
+        return UserCounters.objects.get(user=user)
+
+
+def change_user_counters(user_id, create_missing=True, **deltas):
+    """
+    Атомарно сдвигает счётчики пользователя на deltas.
+
+    Если строки счётчиков ещё нет, она создаётся пересчётом
+    по таблицам. При удалениях create_missing=False: строка могла
+    уже удалиться каскадом вместе с пользователем.
+    """
+    updated = UserCounters.objects.filter(
+        user_id=user_id, **_not_below_zero(deltas)
+    ).update(**{field: F(field) + delta for field, delta in deltas.items()})
+    if not updated and create_missing:
+        recount_users(User.objects.filter(pk=user_id))
+
+
+def change_comments_count(post_id, delta):
+    Post.objects.filter(
+        pk=post_id, **_not_below_zero({'comments_count': delta})
+    ).update(comments_count=F('comments_count') + delta)
+
+
+def recount_users(users=None):
+    """Пересчитывает счётчики пользователей по фактическим данным."""
+    if users is None:
+        users = User.objects.all()
+    UserCounters.objects.bulk_create(
+        (
+            UserCounters(user_id=user_id)
+            for user_id in users.filter(
+                counters__isnull=True
+            ).values_list('pk', flat=True).iterator()
+        ),
+        ignore_conflicts=True,
+    )
+    return UserCounters.objects.filter(user__in=users).update(
+        posts_count=_count_subquery(Post.objects.all(), 'author', 'user_id'),
+        followers_count=_count_subquery(
+            Follow.objects.all(), 'author', 'user_id'
+        ),
+        following_count=_count_subquery(
+            Follow.objects.all(), 'user', 'user_id'
+        ),
+    )
+
+
+def recount_posts(posts=None):
+    """Пересчитывает число комментариев у постов."""
+    if posts is None:
+        posts = Post.objects.all()
+    return posts.update(
+        comments_count=_count_subquery(Comment.objects.all(), 'post')
+    )
@@ -0,0 +1,161 @@
+"""
+Стратегии подсчёта числа постов для классической паджинации лент.
+
+Paginator.count выполняет SELECT COUNT(*) по всей выборке на каждой
+странице. Стратегия выбирается настройкой FEED_COUNT_STRATEGY:
+
+* ExactCount — COUNT(*) на каждый запрос;
+* CachedCount — COUNT(*) кешируется на FEED_COUNT_CACHE_TIMEOUT
+  секунд и сбрасывается при создании, изменении и удалении постов;
+* EstimatedCount — для больших выборок (от ESTIMATED_COUNT_THRESHOLD
+  строк) оценка планировщика БД, для остальных — как CachedCount.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+COUNT_VERSION_KEY = 'posts:feed_count:version'
+
+
+def count_version():
+    return cache.get_or_set(COUNT_VERSION_KEY, time.time_ns, None)
+
+
+def invalidate_counts():
+    """Сбрасывает все закешированные счётчики сменой версии ключей."""
+    try:
+        cache.incr(COUNT_VERSION_KEY)
+    except ValueError:
+        cache.set(COUNT_VERSION_KEY, time.time_ns(), None)
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Быстрая оценка числа строк таблицы модели без COUNT(*) или None.
+
+    PostgreSQL хранит оценку в pg_class.reltuples, в SQLite берётся
+    наибольший rowid: это поиск по B-дереву, но удалённые строки
+    оценку завышают.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'SELECT MAX(rowid) FROM {connection.ops.quote_name(table)}'
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None or row[0] is None:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator, который для нефильтрованной большой таблицы берёт
+    оценку числа строк из estimate_table_rows вместо COUNT(*).
+
+    Если оценка меньше settings.ESTIMATED_COUNT_THRESHOLD или в
+    запросе есть условия, считается точно: на малых таблицах
+    и выборках COUNT(*) дёшев, а ошибка оценки заметна.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if (estimate is not None
+                    and estimate >= settings.ESTIMATED_COUNT_THRESHOLD):
+                return estimate
+        return super().count
+
+
+def estimate_query_rows(queryset):
+    """
+    Оценка числа строк выборки по плану запроса или None.
+
+    PostgreSQL отдаёт оценку в EXPLAIN. В SQLite оценки для выборки
+    с условиями нет, для всей таблицы берётся estimate_table_rows.
+    """
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        return estimate_table_rows(queryset.model, queryset.db)
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class ExactCount:
+    def count(self, queryset):
+        return queryset.count()
+
+
+class CachedCount(ExactCount):
+    def cache_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}:{params!r}'.encode()).hexdigest()
+        return f'posts:feed_count:{count_version()}:{digest}'
+
+    def count(self, queryset):
+        try:
+            key = self.cache_key(queryset)
+        except EmptyResultSet:
+            # Условие заведомо ложно (например, пустой поисковый запрос).
+            return 0
+        return cache.get_or_set(
+            key,
+            lambda: super(CachedCount, self).count(queryset),
+            settings.FEED_COUNT_CACHE_TIMEOUT,
+        )
+
+
+class EstimatedCount(CachedCount):
+    """
+    Оценка планировщика, если выборка не меньше порога: на больших
+    лентах неточность номера последней страницы незаметна, а COUNT(*)
+    дорог. Малые выборки считаются точно, с кешем.
+    """
+
+    def count(self, queryset):
+        estimate = estimate_query_rows(queryset)
+        if (estimate is not None
+                and estimate >= settings.ESTIMATED_COUNT_THRESHOLD):
+            return estimate
+        return super().count(queryset)
+
+
+def get_count_strategy():
+    return import_string(settings.FEED_COUNT_STRATEGY)()
+
+
+class CountingPaginator(Paginator):
+    """Paginator, который считает посты стратегией FEED_COUNT_STRATEGY."""
+
+    @cached_property
+    def count(self):
+        return get_count_strategy().count(self.object_list)
@@ -1,5 +1,10 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import ModelForm
+from django.template.defaultfilters import filesizeformat
 
+from .images import image_size, reencode_image
 from .models import Comment, Post
 
 
@@ -12,6 +17,44 @@ class PostForm(ModelForm):
             'image',
         )
 
+    def clean_image(self):
+        """
+        Ограничивает число пикселей по заголовку файла (ImageField его
+        только открывает, не декодируя) и перекодирует картинку.
+        """
+        image = self.cleaned_data['image']
+        if not isinstance(image, UploadedFile):
+            return image
+        width, height = image_size(image)
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            raise ValidationError(
+                'Картинка больше %(limit)s мегапикселей.',
+                code='max_pixels',
+                params={'limit': settings.POST_IMAGE_MAX_PIXELS // 10 ** 6},
+            )
+        try:
+            return reencode_image(image, settings.POST_IMAGE_MAX_SIZE)
+        except (OSError, ValueError):
+            raise ValidationError(
+                'Не удалось обработать картинку, сохраните её в JPEG '
+                'или PNG.',
+                code='invalid_image',
+            )
+
+    def clean(self):
+        # Содержимое файла больше FILE_UPLOAD_MAX_SIZE не принималось
+        # (core.uploads), поэтому ImageField считает его битым.
+        if getattr(self.files.get('image'), 'oversized', False):
+            self.errors.pop('image', None)
+            self.add_error('image', ValidationError(
+                'Файл больше %(limit)s.',
+                code='max_bytes',
+                params={
+                    'limit': filesizeformat(settings.FILE_UPLOAD_MAX_SIZE)
+                },
+            ))
+        return super().clean()
+
 
 class CommentForm(ModelForm):
     class Meta:
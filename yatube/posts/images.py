@@ -0,0 +1,76 @@
+import os
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files.uploadedfile import InMemoryUploadedFile
+from PIL import Image, ImageOps
+
+# Форматы, в которых картинка сохраняется как есть; прочие — в PNG.
+KEPT_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+# Режимы, которые Pillow умеет записать в PNG; прочие (CMYK, YCbCr,
+# LAB...) переводятся в RGB или RGBA.
+PNG_MODES = ('1', 'L', 'LA', 'I', 'I;16', 'P', 'RGB', 'RGBA')
+
+
+def image_size(file):
+    """
+    Размер картинки в пикселях по заголовку файла, без декодирования.
+
+    Pillow отказывается открывать явные «бомбы» с
+    DecompressionBombError: для них возвращается бесконечный размер.
+    Для нераспознанного файла — (0, 0): его отклонит сам ImageField.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            return image.size
+    except Image.DecompressionBombError:
+        return float('inf'), float('inf')
+    except (OSError, SyntaxError, ValueError):
+        return 0, 0
+    finally:
+        file.seek(0)
+
+
+def reencode_image(file, max_size):
+    """
+    Перекодирует картинку, уменьшая её до max_size по большей стороне.
+
+    Метаданные (EXIF, GPS, ICC и пр.) не переносятся, ориентация из
+    EXIF применяется к пикселям. JPEG декодируется сразу в уменьшенном
+    масштабе (Image.draft), так что в память не попадает полный
+    растр большой фотографии; результат пишется во временный файл,
+    который уходит на диск, если больше FILE_UPLOAD_MAX_MEMORY_SIZE.
+
+    Картинку, которую Pillow не может декодировать или перевести
+    в пригодный режим, сообщает OSError или ValueError.
+    """
+    file.seek(0)
+    with Image.open(file) as source:
+        image_format = source.format
+        width, height = source.size
+        scale = min(1, max_size / max(width, height))
+        source.draft('RGB', (round(width * scale), round(height * scale)))
+        image = ImageOps.exif_transpose(source)
+    image.thumbnail((max_size, max_size))
+    if image_format not in KEPT_FORMATS:
+        image_format = 'PNG'
+    if image_format == 'PNG' and image.mode not in PNG_MODES:
+        has_alpha = 'A' in image.getbands() or 'a' in image.getbands()
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    options = {}
+    if image_format == 'JPEG':
+        image = image.convert('RGB')
+        options = {'quality': 85, 'optimize': True, 'progressive': True}
+    output = SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    )
+    image.save(output, image_format, **options)
+    size = output.tell()
+    output.seek(0)
+    name = os.path.basename(file.name)
+    if image_format != source.format:
+        name = os.path.splitext(name)[0] + '.png'
+    return InMemoryUploadedFile(
+        output, None, name, Image.MIME[image_format], size, None
+    )
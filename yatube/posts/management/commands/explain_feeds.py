@@ -0,0 +1,75 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from posts.models import Comment, Group, Post, User
+from posts.timeline import follow_feed
+
+from yatube.settings import NUMBER_OF_POSTS
+
+FULL_SCAN = re.compile(r'SCAN (TABLE )?posts_|Seq Scan on posts_')
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы выполнения (EXPLAIN) запросов лент: index, '
+        'group_list, profile, комментарии post_detail и follow_index'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='Автор для profile')
+        parser.add_argument('--follower', help='Читатель для follow_index')
+        parser.add_argument('--slug', help='Группа для group_list')
+        parser.add_argument('--post-id', type=int, help='Пост для post_detail')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться с ошибкой, если план содержит полный '
+                 'просмотр таблицы posts_*',
+        )
+
+    @staticmethod
+    def get_or_first(queryset, **lookup):
+        if all(value is None for value in lookup.values()):
+            return queryset.first()
+        return queryset.filter(**lookup).first()
+
+    def feed_querysets(self, options):
+        author = self.get_or_first(
+            User.objects.filter(posts__isnull=False),
+            username=options['username'],
+        )
+        follower = self.get_or_first(
+            User.objects.filter(follower__isnull=False),
+            username=options['follower'],
+        )
+        group = self.get_or_first(Group.objects.all(), slug=options['slug'])
+        post = self.get_or_first(Post.objects.all(), id=options['post_id'])
+        return {
+            'index': Post.objects.for_feed(),
+            'group_list': Post.objects.for_feed().filter(group=group),
+            'profile': Post.objects.for_feed().filter(author=author),
+            'post_detail (comments)': Comment.objects.filter(
+                post=post
+            ).order_by('pub_date'),
+            'follow_index': (
+                follow_feed(follower).for_feed() if follower else None
+            ),
+        }
+
+    def handle(self, *args, **options):
+        full_scans = []
+        for name, queryset in self.feed_querysets(options).items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            if queryset is None:
+                self.stdout.write('  нет данных для построения запроса\n')
+                continue
+            queryset = queryset[:NUMBER_OF_POSTS]
+            self.stdout.write(f'  {queryset.query}')
+            plan = queryset.explain()
+            self.stdout.write(plan + '\n')
+            if any(FULL_SCAN.search(line) and 'USING' not in line
+                   for line in plan.splitlines()):
+                full_scans.append(name)
+        if options['check'] and full_scans:
+            raise CommandError(
+                'Полный просмотр таблицы в запросах: ' + ', '.join(full_scans)
+            )
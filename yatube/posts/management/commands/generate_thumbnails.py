@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.thumbnails import (cached_picture, generate_in_worker,
+                              generate_thumbnail)
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие варианты картинок существующих постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int,
+            default=settings.POST_THUMBNAIL_WORKERS,
+            help='Число параллельных потоков; 0 — в текущем потоке',
+        )
+
+    def missing_thumbnails(self):
+        posts = Post.objects.exclude(image='').values_list('id', 'image')
+        for post_id, name in posts.iterator():
+            if cached_picture(name) is None:
+                yield post_id, name
+
+    def handle(self, *args, **options):
+        missing = list(self.missing_thumbnails())
+        if options['workers']:
+            with ThreadPoolExecutor(options['workers']) as executor:
+                for post_id, name in missing:
+                    executor.submit(generate_in_worker, post_id, name)
+        else:
+            for post_id, name in missing:
+                generate_thumbnail(post_id, name)
+        self.stdout.write(f'Создано миниатюр: {len(missing)}')
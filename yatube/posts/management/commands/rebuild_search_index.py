@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from posts.counting import invalidate_counts
+from posts.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов (POST_SEARCH_BACKEND)'
+
+    def handle(self, *args, **options):
+        count = get_search_backend().rebuild()
+        invalidate_counts()
+        self.stdout.write(f'Проиндексировано постов: {count}')
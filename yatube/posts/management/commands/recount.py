@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from posts.counters import recount_posts, recount_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает денормализованные счётчики: посты, подписчиков '
+        'и подписки пользователей, комментарии постов'
+    )
+
+    def handle(self, *args, **options):
+        users = recount_users()
+        posts = recount_posts()
+        self.stdout.write(
+            f'Пересчитано пользователей: {users}, постов: {posts}'
+        )
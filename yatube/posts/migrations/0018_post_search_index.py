@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:10
+
+from django.db import migrations
+
+CREATE_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5("
+    "text, tokenize='unicode61 remove_diacritics 2')"
+)
+FILL_FTS = (
+    'INSERT INTO posts_post_fts (rowid, text) SELECT id, text FROM posts_post'
+)
+DROP_FTS = 'DROP TABLE IF EXISTS posts_post_fts'
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_FTS)
+    schema_editor.execute(FILL_FTS)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_FTS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0019_post_comment_version'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'updated_at'], name='comment_post_updated_idx'),
+        ),
+    ]
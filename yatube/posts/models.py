@@ -23,6 +23,29 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    FEED_FIELDS = (
+        'text',
+        'pub_date',
+        'updated_at',
+        'version',
+        'image',
+        'comments_count',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+        'group__title',
+        'group__slug',
+    )
+
+    def for_feed(self):
+        """
+        Посты для лент и карточек: автор и группа одним JOIN
+        и только отображаемые поля.
+        """
+        return self.select_related('author', 'group').only(*self.FEED_FIELDS)
+
+
 class Post(CreatedModel):
     text = models.TextField(
         verbose_name='Текст',
@@ -48,9 +71,37 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True,
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date'], name='post_author_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date'], name='post_group_date_idx'
+            ),
+            # Валидаторы страниц: MAX(updated_at) по всем постам,
+            # постам группы или автора без просмотра таблицы.
+            models.Index(fields=['updated_at'], name='post_updated_idx'),
+            models.Index(
+                fields=['author', 'updated_at'],
+                name='post_author_updated_idx',
+            ),
+            models.Index(
+                fields=['group', 'updated_at'], name='post_group_updated_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:NUMBER_OF_SYMBOLS]
@@ -74,6 +125,19 @@ class Comment(CreatedModel):
         help_text='Введите текст комментария'
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['post', 'pub_date'], name='comment_post_date_idx'
+            ),
+            # Валидаторы страницы поста: MAX(updated_at) комментариев
+            # одним поиском по индексу, а не чтением всех комментариев.
+            models.Index(
+                fields=['post', 'updated_at'],
+                name='comment_post_updated_idx',
+            ),
+        ]
+
 
 class Follow(models.Model):
     user = models.ForeignKey(
@@ -90,4 +154,77 @@ class Follow(models.Model):
     )
 
     class Meta:
-        UniqueConstraint(fields=['author', 'user'], name='unique_following')
+        constraints = [
+            UniqueConstraint(
+                fields=['author', 'user'], name='unique_following'
+            ),
+        ]
+
+
+class UserCounters(models.Model):
+    """
+    Денормализованные счётчики пользователя.
+
+    Поддерживаются сигналами posts.signals при создании и удалении
+    постов и подписок; расхождения исправляет команда recount.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='counters',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов',
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        db_index=True,
+        verbose_name='Количество подписчиков',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок',
+    )
+
+    def __str__(self):
+        return f'Счётчики {self.user_id}'
+
+
+class TimelineEntry(models.Model):
+    """
+    Материализованная лента подписок: строка на пару (подписчик, пост).
+
+    Заполняется при публикации поста и при подписке (fan-out-on-write),
+    поэтому follow_index читает ленту одним проходом по индексу
+    (user, pub_date) без соединения posts_follow и posts_post.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Подписчик',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        constraints = [
+            UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_date_idx',
+            ),
+        ]
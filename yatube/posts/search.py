@@ -0,0 +1,127 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+WORD = re.compile(r'\w+')
+
+
+def search_terms(query):
+    """Слова запроса без операторов и знаков препинания."""
+    return WORD.findall(query.lower())
+
+
+class BaseSearchBackend:
+    """
+    Интерфейс поискового бэкенда постов.
+
+    Бэкенд выбирается настройкой POST_SEARCH_BACKEND. Индекс
+    обновляется сигналами posts.signals, полностью перестраивается
+    командой rebuild_search_index.
+    """
+
+    def index_posts(self, posts):
+        """Добавляет или обновляет посты в индексе."""
+        raise NotImplementedError
+
+    def remove_posts(self, post_ids):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Перестраивает индекс по всем постам; возвращает их число."""
+        raise NotImplementedError
+
+    def search(self, queryset, query):
+        """
+        Посты из queryset, содержащие все слова запроса,
+        от самых релевантных к менее релевантным.
+        """
+        raise NotImplementedError
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Поиск без индекса через LIKE: для баз без полнотекстового поиска."""
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return Post.objects.count()
+
+    def search(self, queryset, query):
+        terms = search_terms(query)
+        if not terms:
+            return queryset.none()
+        for term in terms:
+            queryset = queryset.filter(text__icontains=term)
+        return queryset
+
+
+class SQLiteFTS5Backend(BaseSearchBackend):
+    """
+    Полнотекстовый индекс SQLite FTS5 (таблица posts_post_fts,
+    rowid совпадает с id поста, создаётся миграцией 0018).
+
+    Результаты упорядочены по BM25; слова запроса ищутся как
+    отдельные токены, последнее — ещё и как префикс.
+    """
+
+    def index_posts(self, posts):
+        posts = [(post.pk, post.text) for post in posts]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(post_id,) for post_id, _ in posts],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                posts,
+            )
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(post_id,) for post_id in post_ids],
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM {Post._meta.db_table}'
+            )
+            return cursor.rowcount
+
+    @staticmethod
+    def match_expression(query):
+        terms = [f'"{term}"' for term in search_terms(query)]
+        if terms:
+            terms[-1] += '*'
+        return ' '.join(terms)
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = {Post._meta.db_table}.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+            select={'search_rank': f'{FTS_TABLE}.rank'},
+        ).order_by('search_rank', '-pub_date')
+
+
+def get_search_backend():
+    return import_string(settings.POST_SEARCH_BACKEND)()
@@ -0,0 +1,100 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching, counters, counting, thumbnails, timeline
+from .models import Comment, Follow, Group, Post, User, UserCounters
+from .search import get_search_backend
+
+CARD_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, update_fields=None,
+               **kwargs):
+    if raw:
+        return
+    if created:
+        UserCounters.objects.get_or_create(user=instance)
+    elif update_fields is None or CARD_USER_FIELDS & set(update_fields):
+        caching.invalidate_post_cards(
+            instance.posts.values_list('id', flat=True)
+        )
+        caching.invalidate_index_page()
+        caching.touch_content()
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, raw=False, **kwargs):
+    """Пост, перенесённый в другую группу, пропадает из ленты старой."""
+    if raw or instance._state.adding:
+        return
+    moved = Post.objects.filter(pk=instance.pk).exclude(
+        group_id=instance.group_id
+    )
+    if moved.exists():
+        caching.touch_content()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    # Правка может перенести пост в другую группу или изменить
+    # результаты поиска, поэтому счётчики сбрасываются при любом save.
+    counting.invalidate_counts()
+    if raw:
+        return
+    thumbnails.schedule_thumbnail(instance.pk, instance.image)
+    get_search_backend().index_posts([instance])
+    if created:
+        counters.change_user_counters(instance.author_id, posts_count=1)
+        timeline.fan_out_post(instance)
+    else:
+        caching.invalidate_index_page()
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_user_counters(
+        instance.author_id, create_missing=False, posts_count=-1
+    )
+    caching.invalidate_index_page()
+    caching.touch_content()
+    counting.invalidate_counts()
+    get_search_backend().remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_comments_count(instance.post_id, 1)
+        caching.touch_content_on_commit()
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments_count(instance.post_id, -1)
+    caching.touch_content_on_commit()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    caching.touch_content()
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_user_counters(instance.author_id, followers_count=1)
+        counters.change_user_counters(instance.user_id, following_count=1)
+        timeline.backfill_follow(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_user_counters(
+        instance.author_id, create_missing=False, followers_count=-1
+    )
+    counters.change_user_counters(
+        instance.user_id, create_missing=False, following_count=-1
+    )
+    timeline.drop_follow(instance)
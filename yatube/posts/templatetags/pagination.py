@@ -0,0 +1,16 @@
+from django import template
+
+from ..utils import ELLIPSIS, elided_page_range
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_range(page_obj):
+    """Номера страниц вокруг текущей вместо всего page_range."""
+    return list(elided_page_range(page_obj))
+
+
+@register.filter
+def is_ellipsis(value):
+    return value == ELLIPSIS
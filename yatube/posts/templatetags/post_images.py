@@ -0,0 +1,15 @@
+from django import template
+
+from ..thumbnails import ready_picture, thumbnails_ready
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_picture(post):
+    return ready_picture(post.pk, post.image)
+
+
+@register.simple_tag
+def post_thumbnails_ready(post):
+    return thumbnails_ready(post.image)
@@ -0,0 +1,81 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.counting import EstimatedCountPaginator
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        groups = [
+            Group.objects.create(
+                title=f'group {number}', slug=f'group-{number}'
+            )
+            for number in range(20)
+        ]
+        for number in range(30):
+            Post.objects.create(
+                text=f'Пост номер {number}',
+                author=cls.admin,
+                group=groups[number % len(groups)],
+            )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def get_changelist(self, **params):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in context.captured_queries]
+
+    def test_changelist_queries(self):
+        """
+        Список постов не запрашивает авторов и группы построчно
+        и не выводит <select> со всеми группами.
+        """
+        response, queries = self.get_changelist()
+        self.assertLess(len(queries), 10)
+        self.assertNotContains(response, '<option value="">---------</option>')
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=10)
+    def test_changelist_without_count(self):
+        """На большой таблице список обходится без COUNT(*)."""
+        response, queries = self.get_changelist()
+        self.assertFalse([sql for sql in queries if 'COUNT(' in sql])
+        self.assertEqual(response.context['cl'].result_count, 30)
+
+    def test_estimate_used_only_for_large_tables(self):
+        """Малые и отфильтрованные выборки считаются точно."""
+        Post.objects.order_by('pk').first().delete()
+        with override_settings(ESTIMATED_COUNT_THRESHOLD=10):
+            self.assertEqual(
+                EstimatedCountPaginator(Post.objects.all(), 10).count, 30
+            )
+            self.assertEqual(
+                EstimatedCountPaginator(
+                    Post.objects.filter(text__startswith='Пост'), 10
+                ).count,
+                29,
+            )
+        self.assertEqual(
+            EstimatedCountPaginator(Post.objects.all(), 10).count, 29
+        )
+
+    def test_search_uses_index(self):
+        """Поиск в админке идёт через полнотекстовый индекс."""
+        response, queries = self.get_changelist(q='номер 7')
+        self.assertTrue([sql for sql in queries if 'MATCH' in sql])
+        self.assertNotIn('LIKE', ' '.join(queries))
+        self.assertEqual(response.context['cl'].result_count, 1)
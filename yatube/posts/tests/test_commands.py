@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExplainFeedsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.user = User.objects.create_user(username='user')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            text='text', author=cls.author, group=cls.group
+        )
+        Comment.objects.create(post=cls.post, author=cls.user, text='text')
+        Follow.objects.create(author=cls.author, user=cls.user)
+
+    def test_explain_feeds_uses_indexes(self):
+        """
+        explain_feeds печатает планы всех лент, и ни одна
+        не читает таблицы posts_* полным просмотром.
+        """
+        out = StringIO()
+        call_command('explain_feeds', '--check', stdout=out)
+        for name in (
+            'index', 'group_list', 'profile', 'post_detail', 'follow_index'
+        ):
+            with self.subTest(name=name):
+                self.assertIn(name, out.getvalue())
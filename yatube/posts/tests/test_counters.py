@@ -0,0 +1,120 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Post, UserCounters
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def counters(self, user):
+        return UserCounters.objects.get(user=user)
+
+    def test_post_create_and_delete_change_posts_count(self):
+        """Создание и удаление поста меняют счётчик постов автора."""
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'text'}
+        )
+        self.assertEqual(self.counters(self.author).posts_count, 1)
+        Post.objects.filter(author=self.author).delete()
+        self.assertEqual(self.counters(self.author).posts_count, 0)
+
+    def test_add_comment_changes_comments_count(self):
+        """Комментарий увеличивает счётчик комментариев поста."""
+        post = Post.objects.create(text='text', author=self.author)
+        self.authorized_client.post(
+            reverse('posts:add_comment', kwargs={'post_id': post.id}),
+            {'text': 'comment'},
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        Comment.objects.all().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_and_unfollow_change_followers_count(self):
+        """Подписка и отписка меняют счётчики обоих пользователей."""
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author})
+        )
+        self.assertEqual(self.counters(self.author).followers_count, 1)
+        self.assertEqual(self.counters(self.user).following_count, 1)
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author})
+        )
+        self.assertEqual(self.counters(self.author).followers_count, 0)
+        self.assertEqual(self.counters(self.user).following_count, 0)
+
+    def test_pages_show_counters(self):
+        """profile и post_detail показывают счётчики автора."""
+        post = Post.objects.create(text='text', author=self.author)
+        Follow.objects.create(author=self.author, user=self.user)
+        pages = {
+            reverse(
+                'posts:post_detail', kwargs={'post_id': post.id}
+            ): 'author_counters',
+            reverse(
+                'posts:profile', kwargs={'username': self.author}
+            ): 'counters',
+        }
+        for url, context_name in pages.items():
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                counters = response.context[context_name]
+                self.assertEqual(counters.posts_count, 1)
+                self.assertEqual(counters.followers_count, 1)
+
+    def test_post_detail_without_count_queries(self):
+        """post_detail не выполняет COUNT(*) для числа постов автора."""
+        post = Post.objects.create(text='text', author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(
+                reverse('posts:post_detail', kwargs={'post_id': post.id})
+            )
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+
+    def test_recount_repairs_drift(self):
+        """Команда recount исправляет разошедшиеся счётчики."""
+        post = Post.objects.create(text='text', author=self.author)
+        Comment.objects.create(post=post, author=self.user, text='comment')
+        Follow.objects.create(author=self.author, user=self.user)
+        UserCounters.objects.update(
+            posts_count=5, followers_count=5, following_count=5
+        )
+        Post.objects.update(comments_count=5)
+        call_command('recount', stdout=StringIO())
+        author_counters = self.counters(self.author)
+        self.assertEqual(author_counters.posts_count, 1)
+        self.assertEqual(author_counters.followers_count, 1)
+        self.assertEqual(self.counters(self.user).following_count, 1)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_missing_counters_are_recounted(self):
+        """Отсутствующая строка счётчиков создаётся пересчётом."""
+        Post.objects.create(text='text', author=self.author)
+        UserCounters.objects.filter(user=self.author).delete()
+        response = self.authorized_client.get(reverse(
+            'posts:profile', kwargs={'username': self.author})
+        )
+        self.assertEqual(response.context['counters'].posts_count, 1)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from posts.counting import CachedCount, CountingPaginator, EstimatedCount
+from posts.models import Group, Post
+
+User = get_user_model()
+NUMBER_OF_POSTS = 15
+
+
+class CountingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='test_group', slug='test_slug', description='description'
+        )
+        for number in range(NUMBER_OF_POSTS):
+            Post.objects.create(
+                text=f'test_post {number}', author=cls.author, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_count_reused_until_posts_change(self):
+        """
+        Закешированное число постов не пересчитывается, пока посты
+        не создают или не удаляют.
+        """
+        queryset = Post.objects.filter(group=self.group)
+        self.assertEqual(CachedCount().count(queryset), NUMBER_OF_POSTS)
+        with self.assertNumQueries(0):
+            self.assertEqual(CachedCount().count(queryset), NUMBER_OF_POSTS)
+        post = Post.objects.create(
+            text='new_post', author=self.author, group=self.group
+        )
+        self.assertEqual(CachedCount().count(queryset), NUMBER_OF_POSTS + 1)
+        post.delete()
+        self.assertEqual(CachedCount().count(queryset), NUMBER_OF_POSTS)
+
+    def test_cached_count_invalidated_by_group_move(self):
+        """Перенос поста в другую группу сбрасывает счётчики групп."""
+        queryset = Post.objects.filter(group=self.group)
+        CachedCount().count(queryset)
+        post = Post.objects.filter(group=self.group).first()
+        post.group = None
+        post.save()
+        self.assertEqual(CachedCount().count(queryset), NUMBER_OF_POSTS - 1)
+
+    def test_estimated_count_above_threshold(self):
+        """
+        От ESTIMATED_COUNT_THRESHOLD строк берётся оценка БД,
+        ниже порога — точное число.
+        """
+        with override_settings(ESTIMATED_COUNT_THRESHOLD=NUMBER_OF_POSTS):
+            Post.objects.order_by('id').first().delete()
+            # Оценка SQLite по наибольшему rowid не видит удаления.
+            self.assertEqual(
+                EstimatedCount().count(Post.objects.all()), NUMBER_OF_POSTS
+            )
+        with override_settings(ESTIMATED_COUNT_THRESHOLD=NUMBER_OF_POSTS + 1):
+            self.assertEqual(
+                EstimatedCount().count(Post.objects.all()),
+                NUMBER_OF_POSTS - 1,
+            )
+
+    @override_settings(FEED_COUNT_STRATEGY='posts.counting.CachedCount')
+    def test_paginator_uses_configured_strategy(self):
+        """CountingPaginator считает посты стратегией из настроек."""
+        queryset = Post.objects.filter(group=self.group).order_by('-id')
+        self.assertEqual(CountingPaginator(queryset, 10).num_pages, 2)
+        # Только выборка страницы, без COUNT(*).
+        with self.assertNumQueries(1):
+            page = CountingPaginator(queryset, 10).get_page(2)
+            self.assertEqual(len(page), NUMBER_OF_POSTS - 10)
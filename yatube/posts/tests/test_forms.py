@@ -1,20 +1,39 @@
 import shutil
+import struct
+import subprocess
+import sys
 import tempfile
+import zlib
+from io import BytesIO
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image
 from posts.models import Comment, Group, Post
 
 User = get_user_model()
 NEW_TEXT_FOR_POST = 'new_text'
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 TEXT_FOR_COMMENT = 'comment'
+# Перекодирует картинку в отдельном процессе и печатает прирост
+# пикового RSS в килобайтах.
+MEASURE_RSS = '''
+import resource, sys
+from django.conf import settings
+settings.configure()
+from django.core.files import File
+from posts.images import reencode_image
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+with open(sys.argv[1], 'rb') as file:
+    reencode_image(File(file, name='photo.jpg'), int(sys.argv[2]))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+'''
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAIL_WORKERS=0)
 class PostFormsTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -139,3 +158,138 @@ class PostFormsTests(TestCase):
                 post=self.post
             ).exists()
         )
+
+
+def png_chunk(chunk_type, data):
+    return (
+        struct.pack('>I', len(data)) + chunk_type + data
+        + struct.pack('>I', zlib.crc32(chunk_type + data))
+    )
+
+
+def png_header(width, height):
+    """PNG заданного размера почти без пиксельных данных."""
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + png_chunk(
+            b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        )
+        + png_chunk(b'IDAT', zlib.compress(b'\x00'))
+        + png_chunk(b'IEND', b'')
+    )
+
+
+def tiff_bytes(mode, size=(40, 30)):
+    buffer = BytesIO()
+    Image.new(mode, size).save(buffer, 'TIFF')
+    return buffer.getvalue()
+
+
+def jpeg_bytes(size, **options):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'teal').save(buffer, 'JPEG', **options)
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAIL_WORKERS=0)
+class PostImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorised_client = Client()
+        self.authorised_client.force_login(self.user)
+
+    def post_image(self, name, content):
+        return self.authorised_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': NEW_TEXT_FOR_POST,
+                'image': SimpleUploadedFile(name, content),
+            },
+        )
+
+    @override_settings(FILE_UPLOAD_MAX_SIZE=1024)
+    def test_oversized_file_rejected(self):
+        """Файл больше FILE_UPLOAD_MAX_SIZE отклоняется формой."""
+        response = self.post_image('big.jpg', jpeg_bytes((100, 100)) * 10)
+        self.assertFormError(
+            response, 'form', 'image', 'Файл больше 1,0\xa0КБ.'
+        )
+        self.assertFalse(Post.objects.exists())
+
+    def test_too_many_pixels_rejected_before_decode(self):
+        """
+        Картинка больше POST_IMAGE_MAX_PIXELS отклоняется по заголовку,
+        до декодирования (в файле нет пиксельных данных).
+        """
+        response = self.post_image('huge.png', png_header(8000, 6000))
+        self.assertFormError(
+            response, 'form', 'image', 'Картинка больше 40 мегапикселей.'
+        )
+        response = self.post_image('bomb.png', png_header(30000, 30000))
+        self.assertTrue(response.context['form'].has_error('image'))
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(POST_IMAGE_MAX_SIZE=1000)
+    def test_image_reencoded_without_metadata(self):
+        """
+        Картинка уменьшается до POST_IMAGE_MAX_SIZE, EXIF удаляется,
+        а поворот из EXIF применяется к пикселям.
+        """
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = 'Camera'
+        self.post_image(
+            'photo.jpg', jpeg_bytes((3000, 2000), exif=exif.tobytes())
+        )
+        post = Post.objects.get()
+        self.assertEqual(post.image.name, 'posts/photo.jpg')
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (667, 1000))
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_tiff_in_png_incompatible_mode(self):
+        """
+        TIFF в режиме, которого нет в PNG, сохраняется в RGB, а тот,
+        что не переводится в RGB, отклоняется формой без ошибки 500.
+        """
+        response = self.post_image('print.tiff', tiff_bytes('CMYK'))
+        self.assertEqual(response.status_code, 302)
+        post = Post.objects.get()
+        self.assertEqual(post.image.name, 'posts/print.png')
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.mode, 'RGB')
+        response = self.post_image('lab.tiff', tiff_bytes('LAB'))
+        self.assertTrue(response.context['form'].has_error('image'))
+        self.assertEqual(Post.objects.count(), 1)
+
+    def test_reencode_peak_memory_is_bounded(self):
+        """
+        Пиковая память перекодирования 24-мегапиксельной фотографии
+        сопоставима с мегапиксельной и много меньше полного растра.
+        """
+        max_size = 1280
+        peaks = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for size in ((1200, 800), (6000, 4000)):
+                path = f'{directory}/{size[0]}.jpg'
+                with open(path, 'wb') as file:
+                    file.write(jpeg_bytes(size))
+                result = subprocess.run(
+                    [sys.executable, '-c', MEASURE_RSS, path, str(max_size)],
+                    cwd=settings.BASE_DIR, capture_output=True, check=True,
+                )
+                peaks[size] = int(result.stdout)
+        full_raster_kb = 6000 * 4000 * 3 // 1024
+        self.assertLess(peaks[(6000, 4000)], full_raster_kb // 4)
+        self.assertLess(
+            peaks[(6000, 4000)] - peaks[(1200, 800)], full_raster_kb // 8
+        )
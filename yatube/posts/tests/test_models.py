@@ -58,3 +58,18 @@ class PostModelTest(TestCase):
                 self.assertEqual(
                     post._meta.get_field(value).verbose_name, expected
                 )
+
+    def test_save_bumps_version(self):
+        """Сохранение поста увеличивает version и обновляет updated_at."""
+        post = Post.objects.create(author=self.user, text='Новый пост')
+        self.assertEqual(post.version, 1)
+        self.assertGreaterEqual(post.updated_at, post.pub_date)
+        updated_at = post.updated_at
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertEqual(post.version, 2)
+        self.assertGreater(post.updated_at, updated_at)
+        Post.objects.get(pk=post.pk).save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.version, 3)
+        self.assertEqual(post.text, 'Исправленный пост')
@@ -0,0 +1,156 @@
+from about import urls as about_urls
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from posts import urls as posts_urls
+from posts.models import Comment, Follow, Group, Post
+from users import urls as users_urls
+
+User = get_user_model()
+SMALL = 2
+LARGE = 25
+
+# Наибольшее допустимое число запросов к БД на GET каждого именованного
+# адреса (холодный кеш, авторизованный пользователь). Новый адрес
+# без бюджета роняет тест: его число запросов нужно записать сюда.
+QUERY_BUDGETS = {
+    'posts:index': 6,
+    'posts:group_list': 7,
+    'posts:profile': 11,
+    'posts:post_detail': 8,
+    'posts:post_create': 5,
+    'posts:post_edit': 5,
+    'posts:add_comment': 3,
+    'posts:post_comments': 2,
+    'posts:follow_index': 5,
+    'posts:search': 4,
+    'posts:profile_follow': 6,
+    'posts:profile_unfollow': 11,
+    'users:signup': 2,
+    'users:login': 2,
+    'users:logout': 4,
+    'users:password_change_form': 2,
+    'users:password_change_done': 2,
+    'users:password_reset_form': 2,
+    'users:password_reset_done': 2,
+    'users:password_reset_confirm': 3,
+    'users:pasword_reset_complite': 2,
+    'about:author': 2,
+    'about:tech': 2,
+}
+# GET-параметры адресов, без которых страница не делает своей работы.
+QUERY_PARAMS = {
+    'posts:search': {'q': 'test_post'},
+}
+# Адреса, которые проверяются от имени автора поста, а не читателя:
+# остальным пользователям они отвечают редиректом.
+AUTHOR_ROUTES = {'posts:post_edit'}
+
+
+def named_routes():
+    """(имя URL, имена его параметров) всех адресов posts, users и about."""
+    for module in (posts_urls, users_urls, about_urls):
+        for pattern in module.urlpatterns:
+            yield (
+                f'{module.app_name}:{pattern.name}',
+                list(pattern.pattern.converters),
+            )
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Число запросов каждой страницы не зависит от объёма данных
+    и не превышает бюджет из QUERY_BUDGETS.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='test_group', slug='test_slug', description='description'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.post = Post.objects.create(
+            text='test_post', author=cls.author, group=cls.group
+        )
+        cls.arguments = {
+            'slug': cls.group.slug,
+            'username': cls.author.username,
+            'post_id': cls.post.id,
+            'uidb64': urlsafe_base64_encode(force_bytes(cls.user.pk)),
+            'token': default_token_generator.make_token(cls.user),
+        }
+
+    def populate(self, count):
+        """
+        Доводит до count число постов автора, комментариев к посту,
+        подписчиков автора и авторов, на которых подписан пользователь.
+        """
+        for number in range(Post.objects.count(), count):
+            commenter = User.objects.create_user(username=f'user_{number}')
+            Follow.objects.create(user=commenter, author=self.author)
+            Follow.objects.create(user=self.user, author=commenter)
+            Post.objects.create(
+                text=f'test_post {number}',
+                author=self.author,
+                group=self.group,
+            )
+            Post.objects.create(text=f'post {number}', author=commenter)
+            Comment.objects.create(
+                post=self.post, author=commenter, text=f'comment {number}'
+            )
+
+    def count_queries(self):
+        """
+        Число запросов GET каждого адреса с холодным кешем. Изменения
+        (подписка, отписка, выход) откатываются, чтобы все адреса
+        видели одни и те же данные.
+        """
+        counts = {}
+        for name, parameters in named_routes():
+            url = reverse(name, kwargs={
+                parameter: self.arguments[parameter]
+                for parameter in parameters
+            })
+            client = Client()
+            client.force_login(
+                self.author if name in AUTHOR_ROUTES else self.user
+            )
+            cache.clear()
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as context:
+                    response = client.get(url, QUERY_PARAMS.get(name))
+                transaction.set_rollback(True)
+            self.assertLess(response.status_code, 400, name)
+            if name in AUTHOR_ROUTES or name in QUERY_PARAMS:
+                self.assertEqual(response.status_code, 200, name)
+            if name in QUERY_PARAMS:
+                self.assertTrue(response.context['page_obj'], name)
+            counts[name] = len(context.captured_queries)
+        return counts
+
+    def test_queries_do_not_grow_with_data(self):
+        """Число запросов одинаково на малых и больших данных."""
+        self.populate(SMALL)
+        small = self.count_queries()
+        self.populate(LARGE)
+        large = self.count_queries()
+        for name, count in small.items():
+            with self.subTest(name=name):
+                self.assertEqual(large[name], count)
+
+    def test_queries_within_budget(self):
+        """Каждый адрес укладывается в свой бюджет запросов."""
+        self.populate(LARGE)
+        for name, count in self.count_queries().items():
+            with self.subTest(name=name):
+                self.assertIn(name, QUERY_BUDGETS)
+                self.assertLessEqual(count, QUERY_BUDGETS[name])
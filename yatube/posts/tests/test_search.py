@@ -0,0 +1,108 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+from posts.search import FTS_TABLE, SQLiteFTS5Backend
+
+from yatube.settings import NUMBER_OF_POSTS
+
+User = get_user_model()
+
+
+class PostSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.rare = Post.objects.create(
+            text='Кошки спят на солнце, а собаки гуляют', author=cls.user
+        )
+        cls.frequent = Post.objects.create(
+            text='Кошки, кошки, кошки! Все любят кошек', author=cls.user
+        )
+        cls.other = Post.objects.create(
+            text='Про погоду и дождь', author=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def search(self, query, **params):
+        response = self.client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+        return list(response.context['page_obj'])
+
+    def test_search_ranked(self):
+        """Найдены посты со всеми словами, более релевантные — выше."""
+        self.assertEqual(self.search('кошки'), [self.frequent, self.rare])
+        self.assertEqual(self.search('кошки собаки'), [self.rare])
+        self.assertEqual(self.search('дождь'), [self.other])
+
+    def test_last_word_is_prefix(self):
+        """Последнее слово запроса ищется как префикс."""
+        self.assertEqual(self.search('пого'), [self.other])
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Операторы FTS5 и кавычки в запросе не вызывают ошибок."""
+        for query in ('"кошки', 'кошки OR NOT', 'text:*', '()', ''):
+            with self.subTest(query=query):
+                response = self.client.get(
+                    reverse('posts:search'), {'q': query}
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        post = Post.objects.get(pk=self.other.pk)
+        post.text = 'Про снег'
+        post.save()
+        self.assertEqual(self.search('дождь'), [])
+        self.assertEqual(self.search('снег'), [post])
+        post.delete()
+        self.assertEqual(self.search('снег'), [])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+    def test_pagination_keeps_query(self):
+        """Ссылки паджинатора сохраняют поисковый запрос."""
+        Post.objects.bulk_create(
+            Post(text=f'Кошки {number}', author=self.user)
+            for number in range(NUMBER_OF_POSTS)
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        response = self.client.get(reverse('posts:search'), {'q': 'кошки'})
+        self.assertContains(
+            response, '?q=%D0%BA%D0%BE%D1%88%D0%BA%D0%B8&amp;page=2'
+        )
+        self.assertEqual(len(self.search('кошки', page=2)), 2)
+
+    def test_rebuild_search_index(self):
+        """rebuild_search_index индексирует все посты заново."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self.search('кошки'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Проиндексировано постов: 3', out.getvalue())
+        self.assertEqual(self.search('кошки'), [self.frequent, self.rare])
+
+    def test_search_uses_fts_index(self):
+        """Запрос читает FTS-индекс, а не просматривает posts_post."""
+        queryset = SQLiteFTS5Backend().search(Post.objects.for_feed(), 'кошки')
+        plan = queryset.explain()
+        self.assertIn('VIRTUAL TABLE INDEX', plan)
+        self.assertNotRegex(plan, r'SCAN (TABLE )?posts_post\b(?! USING)')
+
+    @override_settings(POST_SEARCH_BACKEND='posts.search.LikeSearchBackend')
+    def test_like_backend(self):
+        """Запасной бэкенд находит посты со всеми словами запроса."""
+        self.assertEqual(self.search('собаки гуляют'), [self.rare])
+        self.assertEqual(self.search('собаки дождь'), [])
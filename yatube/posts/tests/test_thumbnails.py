@@ -0,0 +1,130 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.caching import POST_CARD_FRAGMENT
+from posts.models import Post
+from posts.thumbnails import generate_thumbnail, ready_picture
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+PLACEHOLDER = 'img/thumbnail_placeholder.svg'
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAIL_WORKERS=0)
+class PostThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.post = Post.objects.create(
+            text='test_text',
+            author=cls.user,
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=small_gif,
+                content_type='image/gif'
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # хранилище sorl кеширует записи о миниатюрах
+        cache.clear()
+        self.client = Client()
+
+    def test_placeholder_until_thumbnail_ready(self):
+        """
+        Пока миниатюра не создана, страница не генерирует её сама,
+        а показывает заглушку; после генерации — готовую миниатюру.
+        """
+        url = reverse('posts:post_detail', args=[self.post.id])
+        self.assertContains(self.client.get(url), PLACEHOLDER)
+        self.assertIsNone(ready_picture(self.post.id, self.post.image))
+        generate_thumbnail(self.post.id, self.post.image.name)
+        picture = ready_picture(self.post.id, self.post.image)
+        self.assertIsNotNone(picture)
+        response = self.client.get(url)
+        self.assertNotContains(response, PLACEHOLDER)
+        self.assertContains(response, picture.url)
+
+    def test_placeholder_card_not_served_after_generation(self):
+        """
+        Карточка с заглушкой, закешированная уже после генерации
+        миниатюр, не показывается: готовность входит в ключ карточки.
+        """
+        url = reverse('posts:profile', args=[self.user.username])
+        self.assertContains(self.client.get(url), PLACEHOLDER)
+        key = make_template_fragment_key(POST_CARD_FRAGMENT, [
+            self.post.id, self.post.version, self.post.comments_count,
+            False, 'profile',
+        ])
+        placeholder_card = cache.get(key)
+        self.assertIn(PLACEHOLDER, placeholder_card)
+        generate_thumbnail(self.post.id, self.post.image.name)
+        # Заглушка попала в кеш после генерации.
+        cache.set(key, placeholder_card)
+        self.assertNotContains(self.client.get(url), PLACEHOLDER)
+
+    @override_settings(
+        POST_IMAGE_WIDTHS=(320, 960), POST_IMAGE_FORMATS=('PNG', 'JPEG')
+    )
+    def test_picture_variants(self):
+        """
+        Для картинки создаются варианты всех ширин и форматов: запасной
+        формат попадает в srcset у <img>, остальные — в <source>.
+        """
+        generate_thumbnail(self.post.id, self.post.image.name)
+        picture = ready_picture(self.post.id, self.post.image)
+        self.assertRegex(picture.srcset, r'^\S+\.jpg 320w, \S+\.jpg 960w$')
+        self.assertTrue(picture.url.endswith('.jpg'))
+        [(mime_type, srcset)] = picture.sources
+        self.assertEqual(mime_type, 'image/png')
+        self.assertRegex(srcset, r'^\S+\.png 320w, \S+\.png 960w$')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<source type="image/png"')
+        self.assertContains(response, f'srcset="{picture.srcset}"')
+
+    @override_settings(POST_IMAGE_FORMATS=())
+    def test_original_image_without_supported_formats(self):
+        """
+        Без поддерживаемых форматов миниатюр страница показывает
+        исходную картинку, а не падает.
+        """
+        generate_thumbnail(self.post.id, self.post.image.name)
+        picture = ready_picture(self.post.id, self.post.image)
+        self.assertEqual(picture.url, self.post.image.url)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.post.id])
+        )
+        self.assertContains(response, f'src="{self.post.image.url}"')
+
+    def test_generate_thumbnails_command(self):
+        """generate_thumbnails создаёт только недостающие миниатюры."""
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+        self.assertIn('Создано миниатюр: 1', out.getvalue())
+        self.assertIsNotNone(ready_picture(self.post.id, self.post.image))
+        out = StringIO()
+        call_command('generate_thumbnails', stdout=out)
+        self.assertIn('Создано миниатюр: 0', out.getvalue())
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def follow_page(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return response.context['page_obj'].object_list
+
+    def test_new_post_fanned_out_to_followers(self):
+        """Новый пост автора попадает в материализованную ленту."""
+        Follow.objects.create(author=self.author, user=self.user)
+        post = Post.objects.create(text='text', author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists()
+        )
+        self.assertIn(post, self.follow_page())
+
+    def test_follow_backfills_and_unfollow_drops_timeline(self):
+        """
+        Подписка копирует прошлые посты автора в ленту,
+        отписка удаляет их.
+        """
+        post = Post.objects.create(text='text', author=self.author)
+        self.authorized_client.get(reverse(
+            'posts:profile_follow', kwargs={'username': self.author})
+        )
+        self.assertIn(post, self.follow_page())
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author})
+        )
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+        self.assertNotIn(post, self.follow_page())
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_posts_read_on_demand(self):
+        """
+        Посты автора с большим числом подписчиков не раскладываются
+        по лентам, но видны в ленте подписок.
+        """
+        Follow.objects.create(author=self.author, user=self.user)
+        cache.clear()
+        post = Post.objects.create(text='text', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertIn(post, self.follow_page())
+
+    @override_settings(TIMELINE_CELEBRITIES_CACHE_TIMEOUT=0)
+    def test_former_celebrity_posts_backfilled(self):
+        """
+        Посты, опубликованные автором в роли «знаменитости», остаются
+        в ленте подписчиков, когда подписчиков становится меньше порога.
+        """
+        Follow.objects.create(author=self.author, user=self.user)
+        with override_settings(TIMELINE_FANOUT_LIMIT=0):
+            post = Post.objects.create(text='text', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertIn(post, self.follow_page())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists()
+        )
+
+    def test_rebuild_timeline_command(self):
+        """Команда rebuild_timeline восстанавливает ленту."""
+        Follow.objects.create(author=self.author, user=self.user)
+        post = Post.objects.create(text='text', author=self.author)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timeline', stdout=StringIO())
+        self.assertIn(post, self.follow_page())
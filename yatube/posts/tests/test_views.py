@@ -1,14 +1,22 @@
 import shutil
 import tempfile
+from unittest import mock
 
+from core.testing import run_on_commit
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase, override_settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from posts.models import Follow, Group, Post
+from posts.caching import content_changed, invalidate_index_page
+from posts.models import Comment, Follow, Group, Post
+from posts.utils import KeysetPage
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 NUMBER_OF_POSTS_PAGINATOR = 13
@@ -18,7 +26,7 @@ NEW_TEXT_FOR_POST = 'new_text'
 User = get_user_model()
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAIL_WORKERS=0)
 class PostUrlsTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -240,6 +248,266 @@ class PostPaginatorsTests(TestCase):
                     response.context[context]), NUMBER_OF_POSTS_2ND_PAGE
                 )
 
+    def test_page_links_do_not_grow_with_page_count(self):
+        """
+        Навигация показывает одинаковое число ссылок и почти
+        одинаковый объём HTML при 100 и 20 000 страниц.
+        """
+        request = RequestFactory().get(reverse('posts:index'))
+        sizes = {}
+        for num_pages in (100, 20000):
+            paginator = Paginator(
+                range(num_pages * NUMBER_OF_POSTS_1ST_PAGE),
+                NUMBER_OF_POSTS_1ST_PAGE,
+            )
+            html = render_to_string(
+                'posts/includes/paginator.html',
+                {'page_obj': paginator.page(num_pages // 2)},
+                request,
+            )
+            sizes[num_pages] = (html.count('<li'), len(html))
+        self.assertEqual(sizes[100][0], sizes[20000][0])
+        # Разница только в числе цифр номеров страниц.
+        self.assertLess(sizes[20000][1] - sizes[100][1], 100)
+
+
+@override_settings(PAGINATION_MODES={
+    'index': 'keyset',
+    'group_list': 'keyset',
+    'profile': 'keyset',
+    'follow_index': 'keyset',
+})
+class PostKeysetPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        Post.objects.bulk_create(
+            [
+                Post(
+                    text=f'test_post {n}',
+                    author=cls.user,
+                    group=cls.group,
+                )
+                for n in range(NUMBER_OF_POSTS_PAGINATOR)
+            ]
+        )
+        Follow.objects.create(author=cls.user, user=cls.follower)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user}),
+            reverse('posts:follow_index'),
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.follower)
+        cache.clear()
+
+    def test_keyset_pages_contain_every_post_once(self):
+        """
+        Курсорные страницы лент отдают 10 и 3 поста
+        без пропусков и повторов.
+        """
+        for url in self.urls:
+            with self.subTest(url=url):
+                first_page = self.authorized_client.get(url).context[
+                    'page_obj'
+                ]
+                self.assertIsInstance(first_page, KeysetPage)
+                self.assertEqual(len(first_page), NUMBER_OF_POSTS_1ST_PAGE)
+                self.assertFalse(first_page.has_previous())
+                self.assertTrue(first_page.has_next())
+                second_page = self.authorized_client.get(
+                    url, {'cursor': first_page.next_cursor}
+                ).context['page_obj']
+                self.assertEqual(len(second_page), NUMBER_OF_POSTS_2ND_PAGE)
+                self.assertFalse(second_page.has_next())
+                ids = {post.id for post in first_page}
+                ids |= {post.id for post in second_page}
+                self.assertEqual(len(ids), NUMBER_OF_POSTS_PAGINATOR)
+
+    def test_keyset_previous_cursor_returns_first_page(self):
+        """Курсор «назад» со второй страницы ведёт на первую."""
+        url = reverse('posts:index')
+        first_page = self.authorized_client.get(url).context['page_obj']
+        second_page = self.authorized_client.get(
+            url, {'cursor': first_page.next_cursor}
+        ).context['page_obj']
+        previous_page = self.authorized_client.get(
+            url, {'cursor': second_page.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(previous_page), list(first_page))
+
+    def test_keyset_bad_cursor_returns_first_page(self):
+        """Подделанный курсор не ломает страницу, а ведёт на первую."""
+        url = reverse('posts:index')
+        first_page = self.authorized_client.get(url).context['page_obj']
+        response = self.authorized_client.get(
+            url, {'cursor': first_page.next_cursor + 'x'}
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), list(first_page)
+        )
+
+    def test_keyset_page_without_count_and_offset(self):
+        """Курсорная страница не выполняет COUNT(*) и OFFSET."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        first_page = self.authorized_client.get(url).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(
+                url, {'cursor': first_page.next_cursor}
+            )
+        for query in queries.captured_queries:
+            self.assertFalse(query['sql'].startswith('SELECT COUNT('))
+            self.assertNotIn('OFFSET', query['sql'])
+
+
+class PostFeedQueriesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.follower = User.objects.create_user(username='follower')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        Follow.objects.create(author=cls.author, user=cls.follower)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.follower)
+
+    def create_posts(self, count):
+        """Посты основного автора и столько же постов новых авторов."""
+        posts = []
+        for n in range(count):
+            other_author = User.objects.create_user(
+                username=f'other_{User.objects.count()}',
+                first_name='Имя',
+                last_name='Фамилия',
+            )
+            Follow.objects.create(author=other_author, user=self.follower)
+            for author in (self.author, other_author):
+                posts.append(Post.objects.create(
+                    text=f'test_post {n}', author=author, group=self.group
+                ))
+        return posts
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(url)
+        return len(queries)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """
+        Число запросов лент не растёт с числом постов
+        на странице (нет N+1 по автору и группе).
+        """
+        post = self.create_posts(1)[0]
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+        )
+        one_post_queries = {url: self.count_queries(url) for url in urls}
+        self.create_posts(NUMBER_OF_POSTS_1ST_PAGE // 2)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.count_queries(url), one_post_queries[url]
+                )
+
+    def test_feed_posts_have_comments_count(self):
+        """Посты ленты содержат число комментариев."""
+        post = self.create_posts(1)[0]
+        post.comments.create(author=self.follower, text='comment')
+        cache.clear()
+        response = self.authorized_client.get(reverse('posts:index'))
+        counts = {
+            feed_post.id: feed_post.comments_count
+            for feed_post in response.context['page_obj']
+        }
+        self.assertEqual(counts[post.id], 1)
+
+
+@override_settings(COMMENTS_PER_PAGE=3)
+class PostCommentsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='test_post', author=cls.author)
+        cls.comments = [
+            cls.post.comments.create(
+                author=User.objects.create_user(username=f'reader_{n}'),
+                text=f'comment {n}',
+            )
+            for n in range(7)
+        ]
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_first_page_rendered_with_post(self):
+        """
+        На странице поста — только первые COMMENTS_PER_PAGE комментариев
+        и ссылка на догрузку; авторы не запрашиваются построчно.
+        """
+        single = Post.objects.create(text='single', author=self.author)
+        single.comments.create(author=self.author, text='comment')
+        queries = {}
+        for post in (single, self.post):
+            url = reverse('posts:post_detail', kwargs={'post_id': post.id})
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            queries[post] = len(context)
+        self.assertEqual(queries[self.post], queries[single])
+        self.assertEqual(
+            list(response.context['comments']), self.comments[:3]
+        )
+        self.assertContains(response, 'id="more-comments"')
+
+    def test_load_more_comments(self):
+        """JSON-эндпоинт отдаёт следующие страницы до конца списка."""
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id})
+        )
+        url = response.context['more_comments_url']
+        texts = [comment.text for comment in response.context['comments']]
+        pages = 0
+        while url:
+            page = self.client.get(url).json()
+            texts.extend(
+                line.strip() for line in page['html'].splitlines()
+                if line.strip().startswith('comment ')
+            )
+            url = page['next']
+            pages += 1
+        self.assertEqual(pages, 2)
+        self.assertEqual(
+            texts, [comment.text for comment in self.comments]
+        )
+
+    def test_comments_page_for_missing_post(self):
+        """Для несуществующего поста эндпоинт отвечает 404."""
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
 
 class PostCacheTests(TestCase):
     @classmethod
@@ -265,6 +533,79 @@ class PostCacheTests(TestCase):
         response_3 = self.client.get(reverse('posts:index'))
         self.assertNotEqual(response_1.content, response_3.content)
 
+    def test_post_card_fragment_cached(self):
+        """
+        Карточка поста берётся из кеша, пока пост не сохранён
+        заново, и обновляется после сохранения.
+        """
+        group = Group.objects.create(
+            title='test_group', slug='test_slug', description='description'
+        )
+        post = Post.objects.create(
+            text='old_text', author=self.user, group=group
+        )
+        url = reverse('posts:group_list', kwargs={'slug': group.slug})
+        self.client.get(url)
+        Post.objects.filter(pk=post.pk).update(text=NEW_TEXT_FOR_POST)
+        self.assertContains(self.client.get(url), 'old_text')
+        post.refresh_from_db()
+        post.save()
+        self.assertContains(self.client.get(url), NEW_TEXT_FOR_POST)
+
+    def test_post_card_refreshed_after_comment(self):
+        """Комментарий меняет ключ карточки со счётчиком."""
+        post = Post.objects.create(text='text', author=self.user)
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        self.assertContains(self.client.get(url), 'Комментариев: 0')
+        post.comments.create(author=self.user, text='comment')
+        self.assertContains(self.client.get(url), 'Комментариев: 1')
+
+    def test_post_card_key_follows_version(self):
+        """
+        Карточка обновляется по ключу, даже если удаление фрагмента
+        не дошло до кеша этого воркера.
+        """
+        post = Post.objects.create(text='old_text', author=self.user)
+        url = reverse('posts:profile', kwargs={'username': self.user})
+        self.client.get(url)
+        with mock.patch.object(cache, 'delete_many'):
+            post.text = NEW_TEXT_FOR_POST
+            post.save()
+            Post.objects.filter(pk=post.pk).update(comments_count=5)
+        response = self.client.get(url)
+        self.assertContains(response, NEW_TEXT_FOR_POST)
+        self.assertContains(response, 'Комментариев: 5')
+
+    def test_content_changed_after_comment_committed(self):
+        """
+        Отметка правки ставится только после коммита комментария:
+        до него параллельный запрос связал бы её со старыми данными.
+        """
+        post = Post.objects.create(text='text', author=self.user)
+        changed = content_changed()
+        with run_on_commit():
+            Comment.objects.create(
+                post=post, author=self.user, text='comment'
+            )
+            self.assertEqual(content_changed(), changed)
+        self.assertNotEqual(content_changed(), changed)
+
+    def test_index_refreshed_after_post_edit(self):
+        """Главная страница не показывает устаревший текст после правки."""
+        post = Post.objects.create(text='old_text', author=self.user)
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        self.assertContains(
+            self.client.get(reverse('posts:index')), 'old_text'
+        )
+        authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.id}),
+            {'text': NEW_TEXT_FOR_POST},
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, NEW_TEXT_FOR_POST)
+        self.assertNotContains(response, 'old_text')
+
 
 class PostFollowTests(TestCase):
     @classmethod
@@ -352,3 +693,83 @@ class PostFollowTests(TestCase):
         self.assertNotIn(self.post, response.context.get(
             'page_obj').object_list
         )
+
+
+class ConditionalViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='test_group',
+            slug='test_slug',
+            description='test_description',
+        )
+        cls.post = Post.objects.create(
+            text='test_post', author=cls.author, group=cls.group
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.author}),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.id}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_not_modified_without_rendering(self):
+        """
+        На повторный запрос с ETag или Last-Modified страница отвечает
+        304, не отрисовывая шаблон.
+        """
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                for headers in (
+                    {'HTTP_IF_NONE_MATCH': response['ETag']},
+                    {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']},
+                ):
+                    not_modified = self.guest_client.get(url, **headers)
+                    self.assertEqual(not_modified.status_code, 304)
+                    self.assertEqual(not_modified.templates, [])
+
+    def test_changes_invalidate_validators(self):
+        """Новый пост, правка и комментарий меняют ETag страниц."""
+        etags = {url: self.guest_client.get(url)['ETag'] for url in self.urls}
+        changes = (
+            lambda: Post.objects.create(
+                text='new_post', author=self.author, group=self.group
+            ),
+            lambda: Post.objects.filter(pk=self.post.pk).get().save(),
+            lambda: self.post.comments.create(
+                author=self.author, text='comment'
+            ),
+        )
+        for change in changes:
+            with run_on_commit():
+                change()
+            # Главная страница ещё лежит в cache_page со своим ETag,
+            # остальной кеш (в том числе content_changed) не трогается.
+            invalidate_index_page()
+            for url in self.urls:
+                with self.subTest(url=url):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etags[url]
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    etags[url] = response['ETag']
+
+    def test_etag_depends_on_user(self):
+        """Гость и авторизованный пользователь получают разные ETag."""
+        authorized_client = Client()
+        authorized_client.force_login(self.author)
+        for url in self.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                response = authorized_client.get(
+                    url, HTTP_IF_NONE_MATCH=etag
+                )
+                self.assertEqual(response.status_code, 200)
@@ -0,0 +1,130 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+from posts import write_buffer
+from posts.models import Comment, Follow, Post, TimelineEntry, UserCounters
+
+User = get_user_model()
+NUMBER_OF_WRITERS = 20
+
+
+@override_settings(WRITE_BUFFER=True)
+class WriteBufferTests(TransactionTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(text='test_post', author=self.author)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_comment_visible_after_redirect(self):
+        """Комментарий сохранён к моменту редиректа на страницу поста."""
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.id]),
+            {'text': 'test_comment'},
+            follow=True,
+        )
+        self.assertContains(response, 'test_comment')
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_burst_of_comments(self):
+        """Одновременные комментарии сохраняются все и без потерь."""
+        users = [
+            User.objects.create_user(username=f'user_{n}')
+            for n in range(NUMBER_OF_WRITERS)
+        ]
+        with ThreadPoolExecutor(NUMBER_OF_WRITERS) as executor:
+            list(executor.map(
+                lambda user: write_buffer.add_comment(
+                    self.post, user, f'comment {user.username}'
+                ),
+                users,
+            ))
+        self.assertEqual(
+            Comment.objects.filter(post=self.post).count(), NUMBER_OF_WRITERS
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, NUMBER_OF_WRITERS)
+
+    def test_follow_and_unfollow(self):
+        """
+        Подписка видна сразу после ответа, обновляет счётчики
+        и ленту; отписка их откатывает.
+        """
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        self.assertEqual(
+            UserCounters.objects.get(user=self.author).followers_count, 1
+        )
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=self.post
+        ).exists())
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(
+            UserCounters.objects.get(user=self.author).followers_count, 0
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_last_follow_write_wins(self):
+        """Из подписки и отписки в одной пачке применяется последняя."""
+        writes = [
+            write_buffer.Write(kind, {
+                'user_id': self.reader.id, 'author_id': self.author.id,
+            }, Future())
+            for kind in (write_buffer.FOLLOW, write_buffer.UNFOLLOW,
+                         write_buffer.FOLLOW)
+        ]
+        write_buffer.flush_batch(writes)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            UserCounters.objects.get(user=self.reader).following_count, 1
+        )
+
+    def test_concurrent_follow_counted_once(self):
+        """
+        Подписка, которую между выборкой и вставкой сохранил
+        параллельный запрос, не увеличивает счётчики второй раз.
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        # Выборка existing не видит параллельно вставленную строку.
+        with mock.patch.object(
+            Follow.objects, 'filter', return_value=Follow.objects.none()
+        ):
+            write_buffer.flush_follows({
+                (self.reader.id, self.author.id): write_buffer.FOLLOW,
+            })
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(
+            UserCounters.objects.get(user=self.author).followers_count, 1
+        )
+        self.assertEqual(
+            UserCounters.objects.get(user=self.reader).following_count, 1
+        )
+
+    def test_failed_write_does_not_lose_batch(self):
+        """Ошибка одной записи не мешает сохранить остальные."""
+        bad = write_buffer.Write(write_buffer.COMMENT, {
+            'post_id': self.post.id + 1, 'author_id': self.reader.id,
+            'text': 'lost',
+        }, Future())
+        good = write_buffer.Write(write_buffer.COMMENT, {
+            'post_id': self.post.id, 'author_id': self.reader.id,
+            'text': 'saved',
+        }, Future())
+        write_buffer.flush_batch([bad, good])
+        self.assertIsNotNone(bad.future.exception())
+        self.assertIsNone(good.future.result())
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)), ['saved']
+        )
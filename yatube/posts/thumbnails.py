@@ -0,0 +1,199 @@
+import hashlib
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connection, transaction
+from PIL import Image
+from sorl.thumbnail import default
+from sorl.thumbnail.base import EXTENSIONS, ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+logger = logging.getLogger(__name__)
+
+# url — самый крупный вариант запасного формата для <img src>,
+# srcset — все ширины этого формата, sources — пары (MIME-тип, srcset)
+# для <source> более компактных форматов.
+Picture = namedtuple('Picture', ['url', 'srcset', 'sources'])
+
+
+class PostThumbnailBackend(ThumbnailBackend):
+    def cached_thumbnail(self, file_, geometry_string, **options):
+        """
+        Готовая миниатюра из хранилища sorl или None.
+
+        В отличие от get_thumbnail ничего не генерирует, поэтому
+        безопасно вызывается при отрисовке страницы.
+        """
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = PostThumbnailBackend()
+_pending = set()
+THUMBNAILS_READY_KEY = 'posts:thumbnails_ready:{}'
+_lock = threading.Lock()
+
+
+def image_formats():
+    """Форматы из POST_IMAGE_FORMATS, которые умеют сохранять Pillow и sorl."""
+    Image.init()
+    return [
+        image_format for image_format in settings.POST_IMAGE_FORMATS
+        if image_format in Image.SAVE and image_format in EXTENSIONS
+    ]
+
+
+def image_variants():
+    """Тройки (формат, ширина, геометрия) всех вариантов картинки поста."""
+    width, height = map(int, settings.POST_THUMBNAIL_GEOMETRY.split('x'))
+    for image_format in image_formats():
+        for variant_width in sorted(settings.POST_IMAGE_WIDTHS):
+            variant_height = round(height * variant_width / width)
+            yield (
+                image_format,
+                variant_width,
+                f'{variant_width}x{variant_height}',
+            )
+
+
+def cached_picture(image):
+    """
+    Picture из готовых вариантов или None, если готовы не все.
+
+    Если ни один формат из POST_IMAGE_FORMATS не поддерживается
+    установленным Pillow, показывается исходная картинка.
+    """
+    srcsets = {}
+    url = None
+    for image_format, width, geometry in image_variants():
+        thumbnail = backend.cached_thumbnail(
+            image,
+            geometry,
+            format=image_format,
+            **settings.POST_THUMBNAIL_OPTIONS,
+        )
+        if thumbnail is None:
+            return None
+        srcsets.setdefault(image_format, []).append(
+            f'{thumbnail.url} {width}w'
+        )
+        url = thumbnail.url
+    if not srcsets:
+        return Picture(url=image.url, srcset='', sources=[])
+    *modern_formats, fallback = srcsets
+    return Picture(
+        url=url,
+        srcset=', '.join(srcsets[fallback]),
+        sources=[
+            (f'image/{image_format.lower()}', ', '.join(srcsets[image_format]))
+            for image_format in modern_formats
+        ],
+    )
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.POST_THUMBNAIL_WORKERS,
+        thread_name_prefix='post-thumbnails',
+    )
+
+
+def thumbnails_ready_key(name):
+    return THUMBNAILS_READY_KEY.format(hashlib.md5(name.encode()).hexdigest())
+
+
+def thumbnails_ready(image):
+    """
+    Отметка о том, что все варианты картинки созданы.
+
+    Входит в ключ карточки поста: карточка с заглушкой, закешированная
+    даже после завершения генерации, остаётся под старым ключом и
+    больше не читается. Картинки, миниатюры которых созданы до
+    появления отметки, показываются верно, но под ключом «не готово».
+    """
+    if not image:
+        return True
+    return bool(cache.get(thumbnails_ready_key(image.name)))
+
+
+def generate_thumbnail(post_id, name):
+    """Генерирует все варианты картинки и отмечает их готовность."""
+    try:
+        for image_format, _, geometry in image_variants():
+            backend.get_thumbnail(
+                name,
+                geometry,
+                format=image_format,
+                **settings.POST_THUMBNAIL_OPTIONS,
+            )
+        cache.set(thumbnails_ready_key(name), True, None)
+    except Exception:
+        logger.exception('Не удалось создать миниатюру %s', name)
+    finally:
+        with _lock:
+            _pending.discard(name)
+
+
+def generate_in_worker(post_id, name):
+    close_old_connections()
+    try:
+        generate_thumbnail(post_id, name)
+    finally:
+        connection.close()
+
+
+def schedule_thumbnail(post_id, image):
+    """
+    Ставит генерацию миниатюры в фоновый пул после коммита транзакции.
+
+    При POST_THUMBNAIL_WORKERS = 0 миниатюра создаётся синхронно
+    (тоже после коммита). Задача, потерянная при перезапуске воркера,
+    ставится заново ready_picture при следующем показе карточки.
+    """
+    if not image:
+        return
+    name = image.name
+
+    def submit():
+        with _lock:
+            if name in _pending:
+                return
+            _pending.add(name)
+        if not settings.POST_THUMBNAIL_WORKERS:
+            generate_thumbnail(post_id, name)
+            return
+        # Пул работает отдельно от запроса: задача читает уже
+        # сохранённый файл из хранилища, и воркер сервера её не ждёт.
+        get_executor().submit(generate_in_worker, post_id, name)
+
+    transaction.on_commit(submit)
+
+
+def ready_picture(post_id, image):
+    """
+    Picture, если все варианты картинки уже готовы; иначе ставит их
+    в очередь и возвращает None, чтобы шаблон показал заглушку.
+    """
+    if not image:
+        return None
+    picture = cached_picture(image)
+    if picture is None:
+        schedule_thumbnail(post_id, image)
+    return picture
@@ -0,0 +1,155 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from . import counting
+from .models import Follow, Post, TimelineEntry, UserCounters
+
+CELEBRITIES_CACHE_KEY = 'posts:timeline:celebrities'
+BULK_BATCH_SIZE = 500
+
+
+def _compute_celebrities():
+    return set(
+        UserCounters.objects.filter(
+            followers_count__gt=settings.TIMELINE_FANOUT_LIMIT
+        ).values_list('user_id', flat=True)
+    )
+
+
+def celebrity_ids():
+    """
+    Авторы с числом подписчиков больше TIMELINE_FANOUT_LIMIT.
+
+    Их посты не раскладываются по лентам подписчиков, а читаются
+    напрямую (fan-out-on-read). Множество кешируется, чтобы запись
+    и чтение ленты опирались на одно и то же решение, и пересчитывается
+    раз в TIMELINE_CELEBRITIES_CACHE_TIMEOUT секунд. Авторам, которые
+    при пересчёте выбыли из него, посты раскладываются по лентам
+    (backfill_author): иначе посты, опубликованные ими в роли
+    «знаменитости», пропали бы из лент подписчиков. Если множество
+    вытеснено из кеша, такие переходы не видны — ленты восстанавливает
+    команда rebuild_timeline.
+    """
+    cached = cache.get(CELEBRITIES_CACHE_KEY)
+    # (время следующего пересчёта, множество)
+    if cached is not None and cached[0] > time.time():
+        return cached[1]
+    celebrities = _compute_celebrities()
+    cache.set(
+        CELEBRITIES_CACHE_KEY,
+        (time.time() + settings.TIMELINE_CELEBRITIES_CACHE_TIMEOUT,
+         celebrities),
+        None,
+    )
+    if cached is not None:
+        for author_id in cached[1] - celebrities:
+            backfill_author(author_id)
+    return celebrities
+
+
+def fan_out_post(post):
+    """Добавляет новый пост в ленты всех подписчиков автора."""
+    if post.author_id in celebrity_ids():
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers.iterator()
+        ),
+        batch_size=BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_follow(follow):
+    """Копирует последние посты автора в ленту нового подписчика."""
+    counting.invalidate_counts()
+    if follow.author_id in celebrity_ids():
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id
+    ).order_by('-pub_date').values_list('id', 'pub_date')
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(
+                user_id=follow.user_id, post_id=post_id, pub_date=pub_date
+            )
+            for post_id, pub_date in posts[:settings.TIMELINE_BACKFILL_SIZE]
+        ),
+        batch_size=BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def backfill_author(author_id):
+    """
+    Копирует последние посты автора в ленты всех его подписчиков.
+
+    Подписчиков у бывшей «знаменитости» не больше
+    TIMELINE_FANOUT_LIMIT, поэтому объём вставки ограничен.
+    """
+    counting.invalidate_counts()
+    posts = list(
+        Post.objects.filter(author_id=author_id).order_by(
+            '-pub_date'
+        ).values_list('id', 'pub_date')[:settings.TIMELINE_BACKFILL_SIZE]
+    )
+    followers = Follow.objects.filter(
+        author_id=author_id
+    ).values_list('user_id', flat=True)
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for user_id in followers.iterator()
+            for post_id, pub_date in posts
+        ),
+        batch_size=BULK_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def drop_follow(follow):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    counting.invalidate_counts()
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id, post__author_id=follow.author_id
+    ).delete()
+
+
+def rebuild_timeline(user):
+    """Пересобирает ленту пользователя по его текущим подпискам."""
+    TimelineEntry.objects.filter(user=user).delete()
+    for follow in Follow.objects.filter(user=user):
+        backfill_follow(follow)
+
+
+def follow_feed(user):
+    """
+    Посты авторов, на которых подписан user.
+
+    Основная часть берётся из материализованной ленты; посты
+    «знаменитостей» подмешиваются при чтении.
+    """
+    celebrities = celebrity_ids()
+    if celebrities:
+        followed_celebrities = list(
+            Follow.objects.filter(
+                user=user, author_id__in=celebrities
+            ).values_list('author_id', flat=True)
+        )
+        if followed_celebrities:
+            entries = TimelineEntry.objects.filter(user=user)
+            return Post.objects.filter(
+                Q(id__in=entries.values('post_id'))
+                | Q(author_id__in=followed_celebrities)
+            )
+    return Post.objects.filter(timeline_entries__user=user).order_by(
+        F('timeline_entries__pub_date').desc(),
+        F('timeline_entries__post_id').desc(),
+    )
@@ -1,9 +1,211 @@
-from django.core.paginator import Paginator
+import collections.abc
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db.models import Q
 
 from yatube.settings import NUMBER_OF_POSTS
 
+from .counting import CountingPaginator
+
+CLASSIC_PAGINATION = 'classic'
+KEYSET_PAGINATION = 'keyset'
+
+# Пропуск в окне номеров страниц (elided_page_range)
+ELLIPSIS = '…'
+
+CURSOR_SALT = 'posts.pagination.cursor'
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class KeysetPage(collections.abc.Sequence):
+    """
+    Страница курсорного паджинатора.
+
+    Повторяет интерфейс django.core.paginator.Page в той части,
+    которая нужна шаблонам: итерацию, has_next/has_previous
+    и has_other_pages. Номеров страниц и общего количества нет.
+    """
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return '<KeysetPage of %s objects>' % len(self)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) паджинация без COUNT(*) и OFFSET.
+
+    Страница выбирается условием «строго после/до ключа» по полям
+    ordering, поэтому стоимость любой страницы одинакова. Курсор —
+    подписанный токен с направлением и значениями ключа граничной записи.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+
+    @staticmethod
+    def _field_name(order):
+        return order.lstrip('-')
+
+    @staticmethod
+    def _reverse(order):
+        return order[1:] if order.startswith('-') else '-' + order
+
+    def _key(self, obj):
+        return [
+            getattr(obj, self._field_name(order)) for order in self.ordering
+        ]
+
+    def encode_cursor(self, direction, obj):
+        key = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in self._key(obj)
+        ]
+        return signing.dumps([direction, key], salt=CURSOR_SALT)
+
+    def decode_cursor(self, cursor):
+        """
+        Возвращает (направление, ключ). Пустой, повреждённый или
+        чужой курсор означает первую страницу.
+        """
+        if not cursor:
+            return NEXT, None
+        try:
+            direction, raw_key = signing.loads(cursor, salt=CURSOR_SALT)
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError
+            if len(raw_key) != len(self.ordering):
+                raise ValueError
+            meta = self.queryset.model._meta
+            key = [
+                meta.get_field(self._field_name(order)).to_python(value)
+                for order, value in zip(self.ordering, raw_key)
+            ]
+        except (signing.BadSignature, ValidationError, ValueError, TypeError):
+            return NEXT, None
+        return direction, key
+
+    def _seek(self, ordering, key):
+        """Условие «запись идёт после key» для заданного порядка."""
+        condition = Q()
+        equal = {}
+        for order, value in zip(ordering, key):
+            name = self._field_name(order)
+            lookup = 'lt' if order.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_page(self, cursor=None):
+        direction, key = self.decode_cursor(cursor)
+        ordering = self.ordering
+        if direction == PREVIOUS:
+            ordering = tuple(self._reverse(order) for order in ordering)
+        queryset = self.queryset.order_by(*ordering)
+        if key is not None:
+            queryset = queryset.filter(self._seek(ordering, key))
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if direction == PREVIOUS:
+            if not has_more:
+                # Дошли до начала ленты: отдаём полноценную первую страницу.
+                return self.get_page()
+            object_list.reverse()
+            has_next, has_previous = True, True
+        else:
+            has_next, has_previous = has_more, key is not None
+        next_cursor = previous_cursor = None
+        if has_next and object_list:
+            next_cursor = self.encode_cursor(NEXT, object_list[-1])
+        if has_previous and object_list:
+            previous_cursor = self.encode_cursor(PREVIOUS, object_list[0])
+        return KeysetPage(object_list, self, next_cursor, previous_cursor)
+
+
+def elided_page_range(page, on_each_side=None, on_ends=None):
+    """
+    Номера страниц для навигации: on_ends первых и последних и
+    on_each_side по обе стороны от текущей, пропуски — ELLIPSIS.
+
+    Число номеров не зависит от общего числа страниц, в отличие
+    от paginator.page_range.
+    """
+    if on_each_side is None:
+        on_each_side = settings.PAGE_RANGE_ON_EACH_SIDE
+    if on_ends is None:
+        on_ends = settings.PAGE_RANGE_ON_ENDS
+    number = page.number
+    num_pages = page.paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from page.paginator.page_range
+        return
+    # Пропуск ставится, только если он заменяет больше одного номера.
+    if number > on_each_side + on_ends + 2:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+def get_pagination_mode(request):
+    match = request.resolver_match
+    view_name = match.url_name if match else None
+    return settings.PAGINATION_MODES.get(view_name, CLASSIC_PAGINATION)
+
+
+def comments_page(post, cursor=None):
+    """
+    Страница комментариев поста по курсору (от старых к новым).
+
+    Читается по индексу (post, pub_date), авторы подгружаются
+    тем же запросом.
+    """
+    paginator = KeysetPaginator(
+        post.comments.select_related('author'),
+        settings.COMMENTS_PER_PAGE,
+        ordering=('pub_date', 'id'),
+    )
+    return paginator.get_page(cursor)
+
 
 def pagination(queryset, request):
-    paginator = Paginator(queryset, NUMBER_OF_POSTS)
+    if get_pagination_mode(request) == KEYSET_PAGINATION:
+        paginator = KeysetPaginator(queryset, NUMBER_OF_POSTS)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = CountingPaginator(queryset, NUMBER_OF_POSTS)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
@@ -1,24 +1,97 @@
+from urllib.parse import urlencode
+
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import Max
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.template.loader import render_to_string
+from django.urls import reverse
 
+from . import write_buffer
+from .caching import cache_index_page, conditional_page, content_changed
+from .counters import get_user_counters
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
-from .utils import pagination
+from .models import Group, Post, User
+from .search import get_search_backend
+from .timeline import follow_feed
+from .utils import comments_page, pagination
+
+
+def last_modified(*querysets):
+    """
+    Самое позднее updated_at в querysets или время последнего
+    удаления (content_changed) — что позже.
+    """
+    dates = [
+        queryset.aggregate(last=Max('updated_at'))['last']
+        for queryset in querysets
+    ]
+    return max(date for date in [*dates, content_changed()] if date)
+
+
+def counters_key(user):
+    counters = get_user_counters(user)
+    return (
+        counters.posts_count,
+        counters.followers_count,
+        counters.following_count,
+    )
+
+
+def index_validators(request):
+    return None, last_modified(Post.objects.all())
+
+
+def group_validators(request, slug):
+    group = Group.objects.filter(slug=slug).only('id').first()
+    if group is None:
+        return None
+    return None, last_modified(Post.objects.filter(group=group))
+
 
+def profile_validators(request, username):
+    author = User.objects.filter(username=username).first()
+    if author is None:
+        return None
+    following = (
+        request.user.is_authenticated
+        and author.following.filter(user=request.user).exists()
+    )
+    return (
+        (counters_key(author), following),
+        last_modified(Post.objects.filter(author=author)),
+    )
 
-@cache_page(20, key_prefix='index_page')
+
+def post_detail_validators(request, post_id):
+    post = Post.objects.filter(id=post_id).select_related('author').only(
+        'updated_at', 'version', 'author'
+    ).first()
+    if post is None:
+        return None
+    return (
+        (post.version, counters_key(post.author)),
+        max(post.updated_at, last_modified(post.comments.all())),
+    )
+
+
+@cache_index_page(20)
+@conditional_page(index_validators)
 def index(request):
-    page_obj = pagination(Post.objects.select_related('group').all(), request)
+    page_obj = pagination(Post.objects.for_feed(), request)
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@conditional_page(group_validators)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    page_obj = pagination(group.groups.all(), request)
+    page_obj = pagination(
+        Post.objects.for_feed().filter(group=group), request
+    )
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -26,33 +99,62 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional_page(profile_validators)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    page_obj = pagination(author.posts.all(), request)
+    page_obj = pagination(
+        Post.objects.for_feed().filter(author=author), request
+    )
     following = False
     if request.user.is_authenticated:
         following = author.following.filter(user=request.user).exists()
     context = {
         'author': author,
+        'counters': get_user_counters(author),
         'page_obj': page_obj,
         'following': following
     }
     return render(request, 'posts/profile.html', context)
 
 
+@conditional_page(post_detail_validators)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(Post.objects.for_feed(), id=post_id)
+    comments = comments_page(post)
     form = CommentForm(request.POST or None)
     context = {
         'post': post,
+        'author_counters': get_user_counters(post.author),
         'comments': comments,
+        'more_comments_url': more_comments_url(post.id, comments),
         'form': form
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def more_comments_url(post_id, comments):
+    if not comments.has_next():
+        return None
+    url = reverse('posts:post_comments', args=[post_id])
+    return f'{url}?{urlencode({"cursor": comments.next_cursor})}'
+
+
+def post_comments(request, post_id):
+    """Следующая страница комментариев для кнопки «Показать ещё»."""
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    comments = comments_page(post, request.GET.get('cursor'))
+    return JsonResponse({
+        'html': render_to_string(
+            'posts/includes/comment_list.html',
+            {'comments': comments},
+            request,
+        ),
+        'next': more_comments_url(post.id, comments),
+    })
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -90,45 +192,43 @@ def post_edit(request, post_id):
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
-        comment = form.save(commit=False)
-        comment.author = request.user
-        comment.post = post
-        comment.save()
+        write_buffer.add_comment(post, request.user, form.cleaned_data['text'])
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    page_obj = pagination(Post.objects.filter(
-        author__following__user=request.user), request
-    )
+    page_obj = pagination(follow_feed(request.user).for_feed(), request)
     context = {
         'page_obj': page_obj
     }
     return render(request, 'posts/follow.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = get_search_backend().search(Post.objects.for_feed(), query)
+    context = {
+        'query': query,
+        'page_obj': pagination(posts, request),
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     user = request.user
     if author != user:
-        Follow.objects.get_or_create(
-            author=author,
-            user=user
-        )
+        write_buffer.follow(user, author)
     return redirect('posts:profile', author.username)
 
 
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    user = request.user
-    Follow.objects.filter(
-        author=author,
-        user=user
-    ).delete()
+    write_buffer.unfollow(request.user, author)
     return redirect('posts:profile', author.username)
@@ -0,0 +1,171 @@
+import logging
+import queue
+import threading
+from collections import Counter, namedtuple
+from concurrent.futures import Future, TimeoutError
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from . import caching, counters, timeline
+from .models import Comment, Follow
+
+logger = logging.getLogger(__name__)
+_start_lock = threading.Lock()
+
+COMMENT = 'comment'
+FOLLOW = 'follow'
+UNFOLLOW = 'unfollow'
+
+# kind — COMMENT, FOLLOW или UNFOLLOW, fields — поля записи,
+# future завершается после коммита пачки, в которую попала запись.
+Write = namedtuple('Write', ['kind', 'fields', 'future'])
+
+
+def flush(writes):
+    """
+    Сохраняет пачку записей одной транзакцией.
+
+    bulk_create не отправляет post_save, поэтому счётчики, карточки
+    и ленты обновляются здесь так же, как в posts.signals.
+    """
+    comments = [
+        Comment(**write.fields) for write in writes if write.kind == COMMENT
+    ]
+    # Из нескольких подписок и отписок одной пары важна последняя.
+    follows = {
+        (write.fields['user_id'], write.fields['author_id']): write.kind
+        for write in writes if write.kind != COMMENT
+    }
+    with transaction.atomic():
+        if comments:
+            flush_comments(comments)
+        if follows:
+            flush_follows(follows)
+
+
+def flush_comments(comments):
+    Comment.objects.bulk_create(comments)
+    for post_id, count in Counter(
+        comment.post_id for comment in comments
+    ).items():
+        counters.change_comments_count(post_id, count)
+    caching.touch_content_on_commit()
+
+
+def flush_follows(follows):
+    existing = {
+        (user_id, author_id): follow_id
+        for follow_id, user_id, author_id in Follow.objects.filter(
+            user_id__in={user_id for user_id, _ in follows},
+            author_id__in={author_id for _, author_id in follows},
+        ).values_list('id', 'user_id', 'author_id')
+    }
+    created = []
+    for (user_id, author_id), kind in follows.items():
+        if kind != FOLLOW or (user_id, author_id) in existing:
+            continue
+        follow = Follow(user_id=user_id, author_id=author_id)
+        # Пару мог вставить параллельный запрос после выборки existing:
+        # тогда строка не создана, и счётчики с лентой не трогаются.
+        try:
+            with transaction.atomic():
+                Follow.objects.bulk_create([follow])
+        except IntegrityError:
+            continue
+        created.append(follow)
+    deltas = Counter()
+    for follow in created:
+        deltas[follow.author_id, 'followers_count'] += 1
+        deltas[follow.user_id, 'following_count'] += 1
+        timeline.backfill_follow(follow)
+    for (user_id, field), delta in deltas.items():
+        counters.change_user_counters(user_id, **{field: delta})
+    # Удаление через QuerySet отправляет post_delete для каждой строки.
+    Follow.objects.filter(pk__in=[
+        existing[pair] for pair, kind in follows.items()
+        if kind == UNFOLLOW and pair in existing
+    ]).delete()
+
+
+def flush_batch(batch):
+    try:
+        flush(batch)
+    except Exception:
+        logger.exception('Пачка из %s записей не сохранена', len(batch))
+        # Ошибка одной записи не должна терять остальные.
+        for write in batch:
+            try:
+                flush([write])
+            except Exception as error:
+                write.future.set_exception(error)
+            else:
+                write.future.set_result(None)
+    else:
+        for write in batch:
+            write.future.set_result(None)
+
+
+def run_worker(writes):
+    """
+    Сохраняет очередь пачками: пока идёт транзакция одной пачки,
+    в очереди копятся записи для следующей.
+    """
+    while True:
+        batch = [writes.get()]
+        while len(batch) < settings.WRITE_BUFFER_BATCH_SIZE:
+            try:
+                batch.append(writes.get_nowait())
+            except queue.Empty:
+                break
+        close_old_connections()
+        flush_batch(batch)
+
+
+@lru_cache(maxsize=None)
+def start_worker():
+    writes = queue.Queue()
+    threading.Thread(
+        target=run_worker, args=(writes,), name='write-buffer', daemon=True
+    ).start()
+    return writes
+
+
+def get_queue():
+    # Первые запросы приходят одновременно, а lru_cache не мешает
+    # нескольким потокам запустить по своему воркеру.
+    with _start_lock:
+        return start_worker()
+
+
+def submit(kind, **fields):
+    """
+    Ставит запись в очередь и ждёт коммита её пачки.
+
+    Ожидание даёт пользователю увидеть свою запись сразу после
+    редиректа, а одна транзакция на пачку — меньше борьбы
+    за блокировку записи SQLite. При WRITE_BUFFER = False запись
+    сохраняется сразу в текущем потоке.
+    """
+    write = Write(kind, fields, Future())
+    if not settings.WRITE_BUFFER:
+        flush([write])
+        return
+    get_queue().put(write)
+    try:
+        write.future.result(timeout=settings.WRITE_BUFFER_TIMEOUT)
+    except TimeoutError:
+        logger.warning('Запись %s %s ещё в очереди', kind, fields)
+
+
+def add_comment(post, author, text):
+    submit(COMMENT, post_id=post.id, author_id=author.id, text=text)
+
+
+def follow(user, author):
+    submit(FOLLOW, user_id=user.id, author_id=author.id)
+
+
+def unfollow(user, author):
+    submit(UNFOLLOW, user_id=user.id, author_id=author.id)
@@ -0,0 +1,24 @@
+// Догрузка комментариев поста кнопкой «Показать ещё»:
+// сервер отдаёт готовый HTML следующей страницы и ссылку на следующую.
+(function () {
+  var button = document.getElementById('more-comments');
+  var list = document.getElementById('comments');
+  if (!button || !list) {
+    return;
+  }
+  button.addEventListener('click', function () {
+    button.disabled = true;
+    fetch(button.dataset.url, {credentials: 'same-origin'})
+      .then(function (response) { return response.json(); })
+      .then(function (page) {
+        list.insertAdjacentHTML('beforeend', page.html);
+        if (page.next) {
+          button.dataset.url = page.next;
+          button.disabled = false;
+        } else {
+          button.remove();
+        }
+      })
+      .catch(function () { button.disabled = false; });
+  });
+})();
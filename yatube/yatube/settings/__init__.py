@@ -0,0 +1,18 @@
+"""
+Настройки проекта: общие в base, профиль выбирает DJANGO_ENV.
+
+dev (по умолчанию) — DEBUG и django-debug-toolbar; prod — без
+отладочных приложений и middleware, с кешированными шаблонами.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DJANGO_ENV = os.getenv('DJANGO_ENV', 'dev')
+
+if DJANGO_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
@@ -0,0 +1,316 @@
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+SECRET_KEY = os.getenv('SECRET_KEY')
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+]
+
+
+# Application definition
+INSTALLED_APPS = [
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'core.template_backends.InstrumentedDjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year'
+            ],
+        },
+    },
+]
+
+# Компилировать все шаблоны при старте воркера (имеет смысл только
+# с кеширующим загрузчиком, см. prod).
+TEMPLATES_WARM_UP = False
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# DB_ENGINE=sqlite (по умолчанию) или postgresql (нужен psycopg2,
+# параметры DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT).
+# Соединение живёт DB_CONN_MAX_AGE секунд и переиспользуется
+# следующими запросами воркера. За PgBouncer в режиме transaction
+# (DB_PGBOUNCER=1) серверные курсоры отключаются.
+# SQLite каждому новому соединению выставляет SQLITE_PRAGMAS
+# (core.db): WAL, чтобы запись не блокировала чтение, и ожидание
+# блокировки до DB_TIMEOUT секунд вместо ошибки «database is locked».
+# Вместе с базой выбирается бэкенд поиска по постам: индекс FTS5
+# (миграция 0018) есть только в SQLite, на PostgreSQL поиск идёт
+# через LIKE.
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+DB_TIMEOUT = int(os.getenv('DB_TIMEOUT', 20))
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DB_NAME', 'yatube'),
+            'USER': os.getenv('DB_USER', 'yatube'),
+            'PASSWORD': os.getenv('DB_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'DISABLE_SERVER_SIDE_CURSORS': bool(
+                int(os.getenv('DB_PGBOUNCER', 0))
+            ),
+            'OPTIONS': {'connect_timeout': DB_TIMEOUT},
+        }
+    }
+    POST_SEARCH_BACKEND = 'posts.search.LikeSearchBackend'
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {'timeout': DB_TIMEOUT},
+        }
+    }
+    POST_SEARCH_BACKEND = 'posts.search.SQLiteFTS5Backend'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': DB_TIMEOUT * 1000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+
+# Password validation
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+STATIC_URL = '/static/'
+
+
+LOGIN_URL = 'users:login'
+LOGIN_REDIRECT_URL = 'posts:index'
+LOGOUT_URL = 'post:index'
+
+
+EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# For custom CSRF faliure page
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+
+# My constants
+NUMBER_OF_POSTS = 10
+NUMBER_OF_SYMBOLS = 15
+
+# Навигация по страницам ленты: первые и последние PAGE_RANGE_ON_ENDS
+# номеров и по PAGE_RANGE_ON_EACH_SIDE вокруг текущей страницы
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
+
+# Комментариев на странице поста и в каждой догрузке «Показать ещё»
+COMMENTS_PER_PAGE = 20
+
+# Режим паджинации лент по имени URL: 'classic' (номера страниц,
+# COUNT(*) + OFFSET) или 'keyset' (курсор по pub_date и id,
+# стоимость страницы не зависит от её глубины)
+PAGINATION_MODES = {
+    'index': 'classic',
+    'group_list': 'classic',
+    'profile': 'classic',
+    'follow_index': 'classic',
+}
+
+# Начиная с этого числа строк EstimatedCountPaginator (списки админки)
+# и posts.counting.EstimatedCount (ленты) берут оценку размера выборки
+# из статистики БД вместо COUNT(*).
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+# Подсчёт постов для номеров страниц лент (posts.counting): ExactCount,
+# CachedCount (COUNT(*) в кеше на FEED_COUNT_CACHE_TIMEOUT секунд,
+# сбрасывается при изменении постов) или EstimatedCount.
+FEED_COUNT_STRATEGY = 'posts.counting.EstimatedCount'
+FEED_COUNT_CACHE_TIMEOUT = 60 * 5
+
+# Лента подписок (fan-out-on-write). Посты авторов, у которых подписчиков
+# больше TIMELINE_FANOUT_LIMIT, не раскладываются по лентам, а
+# подмешиваются при чтении. При подписке в ленту копируются последние
+# TIMELINE_BACKFILL_SIZE постов автора. Множество таких авторов
+# пересчитывается раз в TIMELINE_CELEBRITIES_CACHE_TIMEOUT секунд;
+# выбывшим из него посты раскладываются по лентам подписчиков.
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_BACKFILL_SIZE = 200
+TIMELINE_CELEBRITIES_CACHE_TIMEOUT = 60 * 5
+
+# Миниатюры картинок постов создаются фоновым пулом потоков после
+# сохранения поста; до готовности показывается заглушка.
+# POST_THUMBNAIL_WORKERS = 0 — создавать синхронно после коммита.
+POST_THUMBNAIL_GEOMETRY = '960x339'
+POST_THUMBNAIL_OPTIONS = {'crop': 'center', 'upscale': True}
+POST_THUMBNAIL_WORKERS = 2
+# Для srcset создаются варианты нескольких ширин (с пропорциями
+# POST_THUMBNAIL_GEOMETRY) в каждом формате из списка, который умеет
+# сохранять установленный Pillow. Последний формат — запасной для <img>.
+POST_IMAGE_WIDTHS = (320, 480, 720, 960)
+POST_IMAGE_FORMATS = ('WEBP', 'JPEG')
+
+# Буфер записи комментариев и подписок (WRITE_BUFFER=1 в окружении):
+# фоновый поток сохраняет их пачками до WRITE_BUFFER_BATCH_SIZE
+# записей в одной транзакции, запрос ждёт коммита своей пачки
+# не дольше WRITE_BUFFER_TIMEOUT секунд.
+WRITE_BUFFER = bool(int(os.getenv('WRITE_BUFFER', 0)))
+WRITE_BUFFER_BATCH_SIZE = 100
+WRITE_BUFFER_TIMEOUT = 5
+
+
+# Static files (CSS, JavaScript, Images)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+
+# File uploads
+# Первым стоит обработчик, отбрасывающий файлы больше
+# FILE_UPLOAD_MAX_SIZE байт по мере чтения запроса. Картинки постов
+# ограничены по числу пикселей до декодирования и перекодируются
+# без метаданных с большей стороной не более POST_IMAGE_MAX_SIZE.
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.SizeLimitUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+FILE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40 * 10 ** 6
+POST_IMAGE_MAX_SIZE = 2560
+
+
+# Caches backend
+# CACHE_BACKEND=memcached|redis включает общий для всех воркеров кеш
+# (алиас 'shared', адрес в CACHE_LOCATION), а 'default' становится
+# двухуровневым: L1 в памяти процесса + L2 общий (core.cache.TieredCache).
+# Для redis нужен пакет django-redis, для memcached — python-memcached.
+# Увеличение CACHE_VERSION сбрасывает весь кеш при выкладке.
+SHARED_CACHE_BACKENDS = {
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+if CACHE_BACKEND in SHARED_CACHE_BACKENDS:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TieredCache',
+            'OPTIONS': {
+                'SHARED_CACHE': 'shared',
+                'LOCAL_TIMEOUT': int(os.getenv('CACHE_LOCAL_TIMEOUT', 5)),
+            },
+        },
+        'shared': {
+            'BACKEND': SHARED_CACHE_BACKENDS[CACHE_BACKEND],
+            'LOCATION': os.getenv('CACHE_LOCATION'),
+            'KEY_PREFIX': 'yatube',
+            'VERSION': int(os.getenv('CACHE_VERSION', 1)),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'VERSION': int(os.getenv('CACHE_VERSION', 1)),
+        }
+    }
+
+
+# Метрики запросов (core.metrics): время ответа, запросы к БД, рендер
+# шаблонов и попадания в кеш по представлениям. /metrics отдаёт их
+# в формате Prometheus адресам из METRICS_ALLOWED_IPS (по умолчанию
+# никаким: за прокси на той же машине у всех запросов REMOTE_ADDR
+# 127.0.0.1) и персоналу.
+# Ответы дольше METRICS_SLOW_REQUEST_SECONDS пишутся в лог core.metrics
+# с METRICS_SLOW_SQL_LIMIT самыми долгими запросами к БД (в запросе
+# запоминаются первые METRICS_SQL_CAPTURE_LIMIT).
+METRICS_ENABLED = bool(int(os.getenv('METRICS_ENABLED', 1)))
+METRICS_ALLOWED_IPS = [
+    address
+    for address in os.getenv('METRICS_ALLOWED_IPS', '').split(',')
+    if address
+]
+METRICS_SLOW_REQUEST_SECONDS = float(
+    os.getenv('METRICS_SLOW_REQUEST_SECONDS', 0.5)
+)
+METRICS_SLOW_SQL_LIMIT = 10
+METRICS_SQL_CAPTURE_LIMIT = 200
+if METRICS_ENABLED:
+    # Чтения 'default' считаются обёрткой над настроенным кешем.
+    CACHES = {
+        **CACHES,
+        'default': {
+            'BACKEND': 'core.cache.InstrumentedCache',
+            'OPTIONS': {'CACHE': 'uninstrumented'},
+        },
+        'uninstrumented': CACHES['default'],
+    }
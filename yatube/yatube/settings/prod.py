@@ -0,0 +1,29 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import ALLOWED_HOSTS, TEMPLATES
+
+DEBUG = False
+
+# Через запятую: DJANGO_ALLOWED_HOSTS=yatube.example.com,www.yatube.example.com
+ALLOWED_HOSTS = os.getenv(
+    'DJANGO_ALLOWED_HOSTS', ','.join(ALLOWED_HOSTS)
+).split(',')
+
+# Шаблоны компилируются один раз на процесс, а не на каждый запрос:
+# все сразу при старте воркера (core.template_cache, yatube.wsgi).
+TEMPLATES_WARM_UP = True
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]